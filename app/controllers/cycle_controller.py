@@ -3,8 +3,9 @@ import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
 
 from app.dto.cycle_dto import (CacheStatusDTO, CycleByTypeDTO, CycleDataDTO,
                                CycleTimeDataDTO, DateRangeDTO,
@@ -13,12 +14,34 @@ from app.dto.cycle_dto import (CacheStatusDTO, CycleByTypeDTO, CycleDataDTO,
                                MaterialProductionDTO,
                                MaterialSpecProductionDTO, ProductionDataDTO,
                                ProductivityDataDTO)
+from app.middleware.gzip_middleware import accepts_gzip
 from app.services.cycle_service import CycleService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["cycle"])
 
+# Cache HTTP das respostas com ETag: o navegador reutiliza a resposta por pouco
+# tempo e depois revalida (304), pois a URL é a mesma quando os arquivos mudam
+CACHE_CONTROL = "public, max-age=60"
+
+# Formatos binários colunares opcionais (Accept ou ?format=) para respostas grandes
+BINARY_MEDIA_TYPES = {
+    'arrow': "application/vnd.apache.arrow.stream",
+    'parquet': "application/vnd.apache.parquet"
+}
+
+# Serializadores (pydantic-core, em Rust) dos resultados de cada endpoint: os
+# bytes JSON são gerados direto, sem jsonable_encoder + json.dumps do FastAPI
+_CYCLE_DATA_ADAPTER = TypeAdapter(List[CycleDataDTO])
+_CYCLES_BY_TYPE_ADAPTER = TypeAdapter(List[CycleByTypeDTO])
+_PRODUCTION_ADAPTER = TypeAdapter(List[ProductionDataDTO])
+_PRODUCTIVITY_ADAPTER = TypeAdapter(List[ProductivityDataDTO])
+_EQUIPMENT_PRODUCTIVITY_ADAPTER = TypeAdapter(List[EquipmentProductivityDTO])
+_CYCLE_TIME_ADAPTER = TypeAdapter(List[CycleTimeDataDTO])
+_RECORDS_ADAPTER = TypeAdapter(List[Dict[str, Any]])
+_STRINGS_ADAPTER = TypeAdapter(List[str])
+
 
 def get_cycle_service() -> CycleService:
     """Dependency injection para CycleService"""
@@ -26,8 +49,82 @@ def get_cycle_service() -> CycleService:
     return get_cycle_service()
 
 
+def _parse_list_param(valor: Optional[str]) -> Optional[List[str]]:
+    """Converte um parâmetro separado por vírgula em lista ordenada e sem repetições (None se vazio)"""
+    if not valor:
+        return None
+    
+    itens = sorted({item.strip() for item in valor.split(',')} - {''})
+    return itens or None
+
+
+def _log_filters(filters: DateRangeDTO) -> None:
+    """Registra os filtros recebidos numa única mensagem, formatada apenas com o nível DEBUG ativo"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    
+    logger.debug(
+        f"📅 Filtros recebidos - Início: {filters.data_inicio}, Fim: {filters.data_fim}\n"
+        f"🔍 Filtro Tipos Input: {filters.tipos_input}\n"
+        f"🔍 Filtro Frota Transporte: {filters.frota_transporte}\n"
+        f"🔍 Filtro Frota Carga: {filters.frota_carga}\n"
+        f"🔍 Filtro Tag Carga: {filters.tag_carga}"
+    )
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Verifica se o ETag informado pelo cliente (If-None-Match) corresponde ao atual"""
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    
+    client_etags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in client_etags or any(tag.removeprefix('W/') == etag for tag in client_etags)
+
+
+def _json_response(result: Any, adapter: TypeAdapter) -> Response:
+    """Valida o resultado no formato do endpoint e o serializa em JSON de uma vez"""
+    body = adapter.dump_json(adapter.validate_python(result))
+    return Response(content=body, media_type='application/json')
+
+
+def _requested_binary_format(request: Request, formato: Optional[str]) -> Optional[str]:
+    """Retorna o formato binário pedido pelo cliente (?format= ou cabeçalho Accept), ou None para JSON"""
+    if formato:
+        formato = formato.strip().lower()
+        return formato if formato in BINARY_MEDIA_TYPES else None
+    
+    accept = request.headers.get('accept', '')
+    aceitos = {media_type.split(';')[0].strip().lower() for media_type in accept.split(',')}
+    for nome, media_type in BINARY_MEDIA_TYPES.items():
+        if media_type in aceitos:
+            return nome
+    return None
+
+
+def _response_with_etag(request: Request, body: bytes, body_gzip: bytes, etag: str,
+                        media_type: str = 'application/json', vary: str = 'Accept-Encoding') -> Response:
+    """Retorna o corpo já serializado (gzip se aceito), ou 304 se o cliente já possui esta versão.
+
+    Cada representação tem o seu ETag: o do corpo em gzip recebe o sufixo "-gzip",
+    pois os bytes enviados não são os mesmos do corpo puro.
+    """
+    content_encoding = None
+    if accepts_gzip(request.headers.get('accept-encoding', '')):
+        body, etag, content_encoding = body_gzip, f'{etag[:-1]}-gzip"', 'gzip'
+    
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL, 'Vary': vary}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    if content_encoding:
+        headers['Content-Encoding'] = content_encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
 @router.get("/cycles_by_year_month", response_model=List[CycleDataDTO])
 async def get_cycles_by_year_month(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -37,26 +134,15 @@ async def get_cycles_by_year_month(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de ciclos por ano/mês"""
-    logger.info("🚀 API cycles_by_year_month chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API cycles_by_year_month chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -68,40 +154,23 @@ async def get_cycles_by_year_month(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
-        
-        # Processar dados
-        result = cycle_service.get_cycles_by_year_month(filters)
-        
-        # Validar estrutura dos dados antes de retornar
-        if result:
-            logger.info("🔍 Validando estrutura dos dados retornados...")
-            for i, item in enumerate(result):
-                if not isinstance(item, dict):
-                    logger.error(f"❌ Item {i} não é um dicionário: {type(item)}")
-                    raise HTTPException(status_code=500, detail=f"Estrutura de dados inválida: item {i}")
-                
-                required_fields = ['ano_mes', 'count']
-                for field in required_fields:
-                    if field not in item:
-                        logger.error(f"❌ Campo obrigatório '{field}' não encontrado no item {i}")
-                        raise HTTPException(status_code=500, detail=f"Campo obrigatório '{field}' não encontrado")
-                
-                logger.info(f"✅ Item {i} validado: {item}")
-        
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API cycles_by_year_month concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} períodos")
-        
-        return result
+        _log_filters(filters)
+        
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_cycles_by_year_month, filters, _CYCLE_DATA_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
+        
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API cycles_by_year_month concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
+        
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API cycles_by_year_month após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -109,6 +178,7 @@ async def get_cycles_by_year_month(
 
 @router.get("/cycles_by_type_input", response_model=List[CycleByTypeDTO])
 async def get_cycles_by_type_input(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -118,26 +188,15 @@ async def get_cycles_by_type_input(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de ciclos por tipo de input"""
-    logger.info("🚀 API cycles_by_type_input chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API cycles_by_type_input chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -149,24 +208,23 @@ async def get_cycles_by_type_input(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        # Processar dados
-        result = cycle_service.get_cycles_by_type_input(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_cycles_by_type_input, filters, _CYCLES_BY_TYPE_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API cycles_by_type_input concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API cycles_by_type_input concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API cycles_by_type_input após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -174,6 +232,7 @@ async def get_cycles_by_type_input(
 
 @router.get("/production_by_activity_type", response_model=List[ProductionDataDTO])
 async def get_production_by_activity_type(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -183,26 +242,15 @@ async def get_production_by_activity_type(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de produção por tipo de atividade"""
-    logger.info("🚀 API production_by_activity_type chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API production_by_activity_type chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -214,24 +262,23 @@ async def get_production_by_activity_type(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        # Processar dados
-        result = cycle_service.get_production_by_activity_type(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_production_by_activity_type, filters, _PRODUCTION_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API production_by_activity_type concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API production_by_activity_type concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API production_by_activity_type após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -239,6 +286,7 @@ async def get_production_by_activity_type(
 
 @router.get("/production_by_material_spec", response_model=List[Dict[str, Any]])
 async def get_production_by_material_spec(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -248,26 +296,15 @@ async def get_production_by_material_spec(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de produção por especificação de material"""
-    logger.info("🚀 API production_by_material_spec chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API production_by_material_spec chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -279,24 +316,23 @@ async def get_production_by_material_spec(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        # Processar dados
-        result = cycle_service.get_production_by_material_spec(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_production_by_material_spec, filters, _RECORDS_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API production_by_material_spec concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API production_by_material_spec concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API production_by_material_spec após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -304,6 +340,7 @@ async def get_production_by_material_spec(
 
 @router.get("/production_by_material", response_model=List[Dict[str, Any]])
 async def get_production_by_material(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -313,26 +350,15 @@ async def get_production_by_material(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de produção por material"""
-    logger.info("🚀 API production_by_material chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API production_by_material chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -344,24 +370,23 @@ async def get_production_by_material(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        # Processar dados
-        result = cycle_service.get_production_by_material(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_production_by_material, filters, _RECORDS_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API production_by_material concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API production_by_material concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API production_by_material após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -369,6 +394,7 @@ async def get_production_by_material(
 
 @router.get("/production_by_frota_transporte", response_model=List[Dict[str, Any]])
 async def get_production_by_frota_transporte(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -378,26 +404,15 @@ async def get_production_by_frota_transporte(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de produção por frota de transporte"""
-    logger.info("🚀 API production_by_frota_transporte chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API production_by_frota_transporte chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -409,23 +424,23 @@ async def get_production_by_frota_transporte(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        result = cycle_service.get_production_by_frota_transporte(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_production_by_frota_transporte, filters, _RECORDS_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API production_by_frota_transporte concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API production_by_frota_transporte concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API production_by_frota_transporte após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -433,6 +448,7 @@ async def get_production_by_frota_transporte(
 
 @router.get("/production_by_maquinas_carga", response_model=List[Dict[str, Any]])
 async def get_production_by_maquinas_carga(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -442,26 +458,15 @@ async def get_production_by_maquinas_carga(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de produção por máquinas de carga"""
-    logger.info("🚀 API production_by_maquinas_carga chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API production_by_maquinas_carga chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -473,23 +478,23 @@ async def get_production_by_maquinas_carga(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        result = cycle_service.get_production_by_maquinas_carga(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_production_by_maquinas_carga, filters, _RECORDS_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API production_by_maquinas_carga concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API production_by_maquinas_carga concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API production_by_maquinas_carga após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -497,6 +502,7 @@ async def get_production_by_maquinas_carga(
 
 @router.get("/production_by_frota_carga", response_model=List[Dict[str, Any]])
 async def get_production_by_frota_carga(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -506,26 +512,15 @@ async def get_production_by_frota_carga(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de produção por frota de carga"""
-    logger.info("🚀 API production_by_frota_carga chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API production_by_frota_carga chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -537,23 +532,23 @@ async def get_production_by_frota_carga(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        result = cycle_service.get_production_by_frota_carga(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_production_by_frota_carga, filters, _RECORDS_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API production_by_frota_carga concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API production_by_frota_carga concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API production_by_frota_carga após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -561,6 +556,7 @@ async def get_production_by_frota_carga(
 
 @router.get("/productivity_toneladas", response_model=List[Dict[str, Any]])
 async def get_productivity_toneladas(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -570,26 +566,15 @@ async def get_productivity_toneladas(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de produtividade em toneladas"""
-    logger.info("🚀 API productivity_toneladas chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API productivity_toneladas chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -601,23 +586,23 @@ async def get_productivity_toneladas(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        result = cycle_service.get_productivity_toneladas(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_productivity_toneladas, filters, _RECORDS_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API productivity_toneladas concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API productivity_toneladas concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API productivity_toneladas após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -625,6 +610,7 @@ async def get_productivity_toneladas(
 
 @router.get("/productivity_by_equipment_carga_stacked", response_model=List[Dict[str, Any]])
 async def get_productivity_by_equipment_carga_stacked(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     frota_transporte: Optional[str] = Query(None, description="Frotas de transporte separadas por vírgula"),
@@ -633,22 +619,14 @@ async def get_productivity_by_equipment_carga_stacked(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém produtividade por equipamento de carga em colunas empilhadas"""
-    logger.info("🚀 API productivity_by_equipment_carga_stacked chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API productivity_by_equipment_carga_stacked chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -660,22 +638,23 @@ async def get_productivity_by_equipment_carga_stacked(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        result = cycle_service.get_productivity_by_equipment_carga_stacked(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_productivity_by_equipment_carga_stacked, filters, _RECORDS_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API productivity_by_equipment_carga_stacked concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API productivity_by_equipment_carga_stacked concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API productivity_by_equipment_carga_stacked após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -683,6 +662,7 @@ async def get_productivity_by_equipment_carga_stacked(
 
 @router.get("/productivity_analysis", response_model=List[ProductivityDataDTO])
 async def get_productivity_analysis(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -692,26 +672,15 @@ async def get_productivity_analysis(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém análise de produtividade"""
-    logger.info("🚀 API productivity_analysis chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API productivity_analysis chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -723,24 +692,23 @@ async def get_productivity_analysis(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        # Processar dados
-        result = cycle_service.get_productivity_analysis(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_productivity_analysis, filters, _PRODUCTIVITY_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API productivity_analysis concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} períodos")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API productivity_analysis concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API productivity_analysis após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -748,30 +716,24 @@ async def get_productivity_analysis(
 
 @router.get("/productivity_by_equipment", response_model=List[EquipmentProductivityDTO])
 async def get_productivity_by_equipment(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     frota_transporte: Optional[str] = Query(None, description="Frotas de transporte separadas por vírgula"),
     frota_carga: Optional[str] = Query(None, description="Frotas de carga separadas por vírgula"),
     tag_carga: Optional[str] = Query(None, description="Tags de carga separadas por vírgula"),
+    formato: Optional[str] = Query(None, alias="format", description="Formato da resposta: json (padrão), arrow ou parquet"),
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
-    """Obtém produtividade por equipamento"""
-    logger.info("🚀 API productivity_by_equipment chamada")
-    api_start_time = time.time()
+    """Obtém produtividade por equipamento (JSON ou, se solicitado, Arrow IPC / Parquet)"""
+    logger.debug("🚀 API productivity_by_equipment chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -783,23 +745,30 @@ async def get_productivity_by_equipment(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        # Processar dados
-        result = cycle_service.get_productivity_by_equipment(filters)
+        # O formato da resposta (JSON, Arrow ou Parquet) também depende do cabeçalho Accept
+        formato_binario = _requested_binary_format(request, formato)
+        if formato_binario:
+            body, body_gzip, etag = cycle_service.get_productivity_by_equipment_binary(filters, formato_binario)
+            media_type = BINARY_MEDIA_TYPES[formato_binario]
+        else:
+            # Processar dados (JSON validado e serializado em cache no service)
+            body, body_gzip, etag = cycle_service.get_json(cycle_service.get_productivity_by_equipment, filters, _EQUIPMENT_PRODUCTIVITY_ADAPTER)
+            media_type = 'application/json'
+        response = _response_with_etag(request, body, body_gzip, etag, media_type, vary='Accept, Accept-Encoding')
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API productivity_by_equipment concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} registros")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API productivity_by_equipment ({formato_binario or 'json'}) concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API productivity_by_equipment após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
@@ -841,21 +810,20 @@ async def get_cache_status(cycle_service: CycleService = Depends(get_cycle_servi
 @router.get("/tipos_input", response_model=List[str])
 async def get_tipos_input(cycle_service: CycleService = Depends(get_cycle_service)):
     """Obtém lista de tipos de input disponíveis para filtros"""
-    logger.info("🚀 API tipos_input chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API tipos_input chamada")
+    api_start_time = time.perf_counter()
     
     try:
         result = cycle_service.get_available_tipos_input()
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API tipos_input concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Tipos de input retornados: {len(result)}")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API tipos_input concluída em {total_api_time:.2f}s")
+        logger.debug(f"📊 Tipos de input retornados: {len(result)}")
         
-        return result
+        return _json_response(result, _STRINGS_ADAPTER)
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API tipos_input após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao obter tipos de input: {str(e)}")
@@ -864,21 +832,20 @@ async def get_tipos_input(cycle_service: CycleService = Depends(get_cycle_servic
 @router.get("/frota_transporte", response_model=List[str])
 async def get_frota_transporte(cycle_service: CycleService = Depends(get_cycle_service)):
     """Obtém lista de frotas de transporte disponíveis para filtros"""
-    logger.info("🚀 API frota_transporte chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API frota_transporte chamada")
+    api_start_time = time.perf_counter()
     
     try:
         result = cycle_service.get_available_frota_transporte()
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API frota_transporte concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Frotas de transporte retornadas: {len(result)}")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API frota_transporte concluída em {total_api_time:.2f}s")
+        logger.debug(f"📊 Frotas de transporte retornadas: {len(result)}")
         
-        return result
+        return _json_response(result, _STRINGS_ADAPTER)
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API frota_transporte após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao obter frotas de transporte: {str(e)}")
@@ -887,21 +854,20 @@ async def get_frota_transporte(cycle_service: CycleService = Depends(get_cycle_s
 @router.get("/frota_carga", response_model=List[str])
 async def get_frota_carga(cycle_service: CycleService = Depends(get_cycle_service)):
     """Obtém lista de frotas de carga disponíveis para filtros"""
-    logger.info("🚀 API frota_carga chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API frota_carga chamada")
+    api_start_time = time.perf_counter()
     
     try:
         result = cycle_service.get_available_frota_carga()
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API frota_carga concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Frotas de carga retornadas: {len(result)}")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API frota_carga concluída em {total_api_time:.2f}s")
+        logger.debug(f"📊 Frotas de carga retornadas: {len(result)}")
         
-        return result
+        return _json_response(result, _STRINGS_ADAPTER)
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API frota_carga após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao obter frotas de carga: {str(e)}")
@@ -910,21 +876,20 @@ async def get_frota_carga(cycle_service: CycleService = Depends(get_cycle_servic
 @router.get("/tag_carga", response_model=List[str])
 async def get_tag_carga(cycle_service: CycleService = Depends(get_cycle_service)):
     """Obtém lista de tags de carga disponíveis para filtros"""
-    logger.info("🚀 API tag_carga chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API tag_carga chamada")
+    api_start_time = time.perf_counter()
     
     try:
         result = cycle_service.get_available_tag_carga()
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API tag_carga concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Tags de carga retornadas: {len(result)}")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API tag_carga concluída em {total_api_time:.2f}s")
+        logger.debug(f"📊 Tags de carga retornadas: {len(result)}")
         
-        return result
+        return _json_response(result, _STRINGS_ADAPTER)
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API tag_carga após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao obter tags de carga: {str(e)}")
@@ -932,6 +897,7 @@ async def get_tag_carga(cycle_service: CycleService = Depends(get_cycle_service)
 
 @router.get("/cycle_time_stacked", response_model=List[CycleTimeDataDTO])
 async def get_cycle_time_stacked(
+    request: Request,
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
     tipos_input: Optional[str] = Query(None, description="Tipos de input separados por vírgula"),
@@ -941,26 +907,15 @@ async def get_cycle_time_stacked(
     cycle_service: CycleService = Depends(get_cycle_service)
 ):
     """Obtém dados de tempo de ciclo empilhado pela média mensal"""
-    logger.info("🚀 API cycle_time_stacked chamada")
-    api_start_time = time.time()
+    logger.debug("🚀 API cycle_time_stacked chamada")
+    api_start_time = time.perf_counter()
     
     try:
         # Processar parâmetros
-        tipos_input_list = None
-        if tipos_input:
-            tipos_input_list = [tipo.strip() for tipo in tipos_input.split(',') if tipo.strip()]
-        
-        frota_transporte_list = None
-        if frota_transporte:
-            frota_transporte_list = [frota.strip() for frota in frota_transporte.split(',') if frota.strip()]
-        
-        frota_carga_list = None
-        if frota_carga:
-            frota_carga_list = [frota.strip() for frota in frota_carga.split(',') if frota.strip()]
-        
-        tag_carga_list = None
-        if tag_carga:
-            tag_carga_list = [tag.strip() for tag in tag_carga.split(',') if tag.strip()]
+        tipos_input_list = _parse_list_param(tipos_input)
+        frota_transporte_list = _parse_list_param(frota_transporte)
+        frota_carga_list = _parse_list_param(frota_carga)
+        tag_carga_list = _parse_list_param(tag_carga)
         
         # Criar DTO de filtros
         filters = DateRangeDTO(
@@ -972,24 +927,23 @@ async def get_cycle_time_stacked(
             tag_carga=tag_carga_list
         )
         
-        logger.info(f"📅 Filtros recebidos - Início: {data_inicio}, Fim: {data_fim}")
-        logger.info(f"🔍 Filtro Tipos Input: {tipos_input_list}")
-        logger.info(f"🔍 Filtro Frota Transporte: {frota_transporte_list}")
-        logger.info(f"🔍 Filtro Frota Carga: {frota_carga_list}")
-        logger.info(f"🔍 Filtro Tag Carga: {tag_carga_list}")
+        _log_filters(filters)
         
-        # Processar dados
-        result = cycle_service.get_cycle_time_stacked(filters)
+        # Processar dados (JSON validado e serializado em cache no service)
+        body, body_gzip, etag = cycle_service.get_json(cycle_service.get_cycle_time_stacked, filters, _CYCLE_TIME_ADAPTER)
+        response = _response_with_etag(request, body, body_gzip, etag)
         
-        total_api_time = time.time() - api_start_time
-        logger.info(f"✅ API cycle_time_stacked concluída com sucesso!")
-        logger.info(f"⏱️  Tempo total da API: {total_api_time:.2f}s")
-        logger.info(f"📊 Dados retornados: {len(result)} períodos")
+        total_api_time = time.perf_counter() - api_start_time
+        logger.info(f"✅ API cycle_time_stacked concluída em {total_api_time:.2f}s")
+        if response.status_code == 304:
+            logger.debug("📦 Dados não modificados (304)")
+        else:
+            logger.debug(f"📊 Dados retornados: {len(body):,} bytes")
         
-        return result
+        return response
     
     except Exception as e:
-        error_time = time.time() - api_start_time
+        error_time = time.perf_counter() - api_start_time
         logger.error(f"❌ Erro na API cycle_time_stacked após {error_time:.2f}s: {str(e)}")
         logger.exception("Detalhes do erro:")
         raise HTTPException(status_code=500, detail=f"Erro ao processar dados: {str(e)}")
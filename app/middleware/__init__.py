@@ -0,0 +1 @@
+# Middleware - Processamento comum das requisições e respostas HTTP
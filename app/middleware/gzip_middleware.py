@@ -0,0 +1,31 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Verifica se o cabeçalho Accept-Encoding aceita respostas comprimidas com gzip"""
+    for encoding in accept_encoding.split(','):
+        name, _, params = encoding.strip().partition(';')
+        if name.strip().lower() == 'gzip':
+            # "gzip;q=0" significa que o cliente recusa gzip
+            _, _, quality = params.partition('q=')
+            try:
+                return not quality or float(quality) > 0
+            except ValueError:
+                return True
+    return False
+
+
+class NegotiatedGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware que só comprime quando o cliente de fato aceita gzip.
+
+    O middleware do Starlette procura "gzip" como substring do Accept-Encoding e
+    comprimiria também para "gzip;q=0", em que o cliente recusa gzip.
+    """
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -1,3 +1,4 @@
+import threading
 from typing import Optional
 
 from fastapi import APIRouter
@@ -39,3 +40,14 @@ def configure_cycle_module():
     # Inicializar dependências
     get_cycle_repository()
     get_cycle_service()
+
+
+def warm_up_cycle_cache():
+    """Inicia o pré-carregamento dos dados (e dos gráficos sem filtros) em segundo plano"""
+    # Em uma thread para não bloquear a inicialização do servidor; a primeira
+    # requisição encontra o cache pronto (ou aguarda o cálculo em andamento)
+    threading.Thread(
+        target=get_cycle_service().warm_up,
+        name="cycle-cache-warmup",
+        daemon=True
+    ).start()
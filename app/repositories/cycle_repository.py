@@ -1,94 +1,410 @@
 import glob
+import hashlib
 import logging
 import os
+import tempfile
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 logger = logging.getLogger(__name__)
 
+# Copy-on-Write: DataFrames derivados dos dados em cache (filtros, fatias) nunca
+# alteram o cache, e só copiam os dados quando uma coluna é modificada
+pd.set_option('mode.copy_on_write', True)
+
+# Colunas carregadas dos arquivos Excel
+EXCEL_COLUMNS = [
+    'DataHoraInicio', 'Tipo Input', 'Massa',
+    'Tipo de atividade', 'Especificacao de material',
+    'Material', 'Tag carga', 'Frota carga', 'Frota transporte',
+    'Operando vazio', 'Fila carga', 'Manobra carga', 'Carga',
+    'Operando cheio', 'Fila Descarga', 'Manobra descarga', 'Descarga'
+]
+
+# Colunas com os tempos de cada fase do ciclo ('00:06:05.0000000'), convertidas
+# para minutos na carga
+TIME_COLUMNS = [
+    'Operando vazio', 'Fila carga', 'Manobra carga', 'Carga',
+    'Operando cheio', 'Fila Descarga', 'Manobra descarga', 'Descarga'
+]
+
+# Formato das colunas de tempo do ciclo
+TIME_PATTERN = r'^(?P<horas>\d+):(?P<minutos>\d+):(?P<segundos>\d+(?:\.\d*)?)$'
+
+# Colunas de texto com poucos valores distintos, usadas em filtros e agrupamentos:
+# mantidas como category (códigos inteiros em vez de uma string por linha)
+CATEGORY_COLUMNS = [
+    'Tipo Input', 'Tipo de atividade', 'Especificacao de material',
+    'Material', 'Tag carga', 'Frota carga', 'Frota transporte'
+]
+
+# Colunas category cujos rótulos têm os espaços das bordas removidos na carga
+# (as demais mantêm os rótulos como estão nos arquivos)
+STRIPPED_CATEGORY_COLUMNS = ['Tipo Input', 'Frota transporte', 'Tag carga']
+
+# Formato de DataHoraInicio nos arquivos ('2024-06-27 09:13:16.000'): com formato
+# fixo o pandas usa o parser em C, sem inferir o formato elemento a elemento
+DATA_HORA_FORMAT = 'ISO8601'
+
+# Data base dos números de série de datas do Excel
+EXCEL_EPOCH = '1899-12-30'
+
+# Quantidade máxima de resultados processados mantidos em cache (cada combinação de
+# filtros ocupa uma entrada por endpoint; os resultados são pequenos)
+PROCESSED_CACHE_MAX_ENTRIES = 512
+
+# Intervalo (segundos) em que o hash dos arquivos é reaproveitado sem consultar o
+# diretório: as requisições de uma mesma carga do painel fazem uma única verificação
+FILES_CHECK_INTERVAL = 2.0
+
+# Versão do processamento feito em _load_excel_files, parte da chave do cache em disco
+# dos dados processados: incrementar ao mudar conversões, colunas derivadas etc.
+PROCESSED_DISK_CACHE_VERSION = 2
+
+
+def _read_excel_file(filename: str) -> Tuple[pd.DataFrame, float]:
+    """Lê um arquivo Excel e retorna o DataFrame e o tempo gasto.
+
+    Função de módulo para poder ser executada em um processo separado.
+    """
+    file_start = time.perf_counter()
+
+    # Carregar as colunas necessárias (calamine: parser em Rust,
+    # sem criar um objeto Python por célula como o openpyxl)
+    df = pd.read_excel(filename, usecols=EXCEL_COLUMNS, engine='calamine', dtype_backend='pyarrow')
+
+    return df, time.perf_counter() - file_start
+
+
+def _convert_time_to_minutes(time_str: Any) -> float:
+    """Converte tempo no formato HH:MM:SS para minutos (float)"""
+    try:
+        if pd.isna(time_str) or time_str == '' or time_str == '00:00:00':
+            return 0.0
+        
+        # Se já é numérico, retornar como está
+        if isinstance(time_str, (int, float)):
+            return float(time_str)
+        
+        # Converter string para minutos
+        time_str = str(time_str).strip()
+        
+        # Tratar diferentes formatos de tempo
+        if ':' in time_str:
+            # Formato HH:MM:SS ou MM:SS
+            parts = time_str.split(':')
+            if len(parts) == 3:  # HH:MM:SS
+                hours, minutes, seconds = map(float, parts)
+                return hours * 60 + minutes + seconds / 60
+            elif len(parts) == 2:  # MM:SS
+                minutes, seconds = map(float, parts)
+                return minutes + seconds / 60
+        else:
+            # Tentar converter diretamente para float
+            return float(time_str)
+            
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"⚠️ Erro ao converter tempo '{time_str}': {e}. Usando 0.")
+        return 0.0
+
 
 class CycleRepository:
     """Repository para acesso aos dados de ciclo com cache inteligente"""
     
     def __init__(self, data_path: str = 'CicloDetalhado'):
         self.data_path = data_path
+        self.cache_dir = os.path.join(data_path, '.cache')
         self._cache: Dict[str, Any] = {
             'raw_data': None,
             'processed_data': None,
             'last_check': None,
-            'files_hash': None
+            'files_hash': None,
+            'dir_mtime': None,
+            'dir_checked_at': None,
+            'current_files_hash': None
         }
+        # Garante um único carregamento por vez (requisições concorrentes aguardam o
+        # carregamento em andamento em vez de ler os arquivos novamente)
+        self._load_lock = threading.Lock()
+        # Protege as leituras e trocas das entradas de _cache, para que cada
+        # requisição veja um estado consistente (dados + hash dos arquivos)
+        self._cache_lock = threading.RLock()
+        # Um lock por chave de resultado processado, com o número de requisições que o
+        # usam (ver get_or_compute_processed_data)
+        self._processed_locks: Dict[str, list] = {}
+        self._processed_locks_guard = threading.Lock()
     
-    def _get_files_hash(self) -> int:
-        """Calcula hash dos arquivos para detectar mudanças"""
-        all_files = glob.glob(f"{self.data_path}/*.xlsx")
+    def _scan_excel_files(self) -> Tuple[list, int]:
+        """Lista os arquivos Excel válidos (ordenados) e conta os temporários"""
+        # os.scandir traz os metadados junto da listagem do diretório,
+        # evitando um stat extra por arquivo
+        with os.scandir(self.data_path) as it:
+            entries = [e for e in it if e.name.endswith('.xlsx') and e.is_file()]
         
         # Filtrar arquivos temporários do Excel (que começam com ~$)
-        all_files = [f for f in all_files if not os.path.basename(f).startswith('~$')]
+        valid_entries = sorted((e for e in entries if not e.name.startswith('~$')), key=lambda e: e.name)
+        return valid_entries, len(entries) - len(valid_entries)
+    
+    def _get_files_hash(self) -> str:
+        """Calcula hash dos arquivos para detectar mudanças"""
+        # Se o diretório não mudou desde o último cálculo, reaproveitar o hash
+        # (um único stat em vez de glob + stat de cada arquivo a cada requisição).
+        # O Excel salva via arquivo temporário + renomeação, o que atualiza o
+        # mtime do diretório. Dentro de FILES_CHECK_INTERVAL nem o stat é feito.
+        agora = time.monotonic()
+        with self._cache_lock:
+            checked_at = self._cache['dir_checked_at']
+            if (checked_at is not None and agora - checked_at < FILES_CHECK_INTERVAL and
+                    self._cache['current_files_hash'] is not None):
+                return self._cache['current_files_hash']
+        
+        dir_mtime = os.stat(self.data_path).st_mtime_ns
+        with self._cache_lock:
+            if dir_mtime == self._cache['dir_mtime'] and self._cache['current_files_hash'] is not None:
+                self._cache['dir_checked_at'] = agora
+                return self._cache['current_files_hash']
+        
+        entries, _ = self._scan_excel_files()
         
         files_info = []
-        for filename in all_files:
-            stat = os.stat(filename)
-            files_info.append(f"{filename}:{stat.st_size}:{stat.st_mtime}")
+        for entry in entries:
+            stat = entry.stat()
+            # mtime em nanossegundos (inteiro), como no cache em disco de cada arquivo:
+            # sem arredondamentos do float na comparação entre verificações
+            files_info.append(f"{entry.path}:{stat.st_size}:{stat.st_mtime_ns}")
         
-        return hash(tuple(sorted(files_info)))
+        # Hash estável entre processos (o hash() do Python muda a cada execução),
+        # necessário para reaproveitar o cache em disco após reinícios
+        hasher = hashlib.blake2b(digest_size=16)
+        for info in sorted(files_info):
+            hasher.update(info.encode())
+            hasher.update(b'|')
+        files_hash = hasher.hexdigest()
+        
+        with self._cache_lock:
+            self._cache['dir_mtime'] = dir_mtime
+            self._cache['dir_checked_at'] = agora
+            self._cache['current_files_hash'] = files_hash
+        return files_hash
+    
+    def _get_disk_cache_path(self, entry: os.DirEntry) -> str:
+        """Caminho do cache em disco (Arrow IPC) de um arquivo Excel, pela versão do arquivo"""
+        stat = entry.stat()
+        file_key = hashlib.blake2b(
+            f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns}".encode(), digest_size=8
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"{os.path.splitext(entry.name)[0]}_{file_key}.arrow")
+    
+    def _get_processed_cache_path(self, cache_paths: list) -> str:
+        """Caminho do cache em disco (Arrow IPC) dos dados processados, pela versão de todos os arquivos"""
+        files_key = '|'.join(sorted(os.path.basename(cache_path) for cache_path in cache_paths))
+        processed_key = hashlib.blake2b(
+            f"{PROCESSED_DISK_CACHE_VERSION}:{files_key}".encode(), digest_size=8
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"processed_{processed_key}.arrow")
+    
+    def _load_processed_cache(self, cache_path: str) -> Optional[pd.DataFrame]:
+        """Carrega os dados já processados (combinados e convertidos) do cache em disco, se existir"""
+        if not os.path.exists(cache_path):
+            return None
+        
+        try:
+            with pa.memory_map(cache_path) as source:
+                table = pa.ipc.open_file(source).read_all()
+            # Os metadados do pandas gravados no arquivo restauram os tipos das
+            # colunas (category, datetime64, Massa em Arrow); apenas os rótulos das
+            # categorias voltam para o tipo string da carga original (Arrow)
+            df = table.to_pandas()
+            for col in CATEGORY_COLUMNS:
+                categorias = df[col].cat.categories
+                if pd.api.types.is_string_dtype(categorias):
+                    df[col] = df[col].cat.rename_categories(categorias.astype(pd.ArrowDtype(pa.string())))
+            return df
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao ler cache em disco {cache_path}: {e}")
+            return None
+    
+    def _load_disk_cache(self, cache_path: str) -> Optional[pd.DataFrame]:
+        """Carrega os dados de um arquivo a partir do cache em disco, se existir"""
+        if not os.path.exists(cache_path):
+            return None
+        
+        try:
+            # Arquivo mapeado em memória e sem compressão: as colunas Arrow são
+            # usadas diretamente, sem decodificar nem copiar os dados
+            with pa.memory_map(cache_path) as source:
+                table = pa.ipc.open_file(source).read_all()
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao ler cache em disco {cache_path}: {e}")
+            return None
+    
+    def _save_disk_cache(self, df: pd.DataFrame, cache_path: str) -> None:
+        """Salva os dados de um arquivo (ou os dados processados) no cache em disco"""
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            
+            # Gravar em arquivo temporário (único por processo, pois vários workers
+            # compartilham o diretório) e renomear, para nunca expor um arquivo incompleto
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as sink:
+                tmp_path = sink.name
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, cache_path)
+            logger.debug(f"💾 Cache em disco salvo: {cache_path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao salvar cache em disco {cache_path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+    
+    def _remove_disk_cache(self, keep: Optional[set] = None) -> None:
+        """Remove arquivos de cache em disco (exceto os informados em keep)
+        
+        Arquivos .tmp nunca são removidos: podem ser gravações em andamento de outro worker.
+        """
+        keep = keep or set()
+        for cache_path in glob.glob(os.path.join(self.cache_dir, '*')):
+            if cache_path in keep or cache_path.endswith('.tmp'):
+                continue
+            try:
+                os.remove(cache_path)
+            except OSError as e:
+                logger.warning(f"⚠️ Erro ao remover cache em disco {cache_path}: {e}")
     
     def _load_excel_files(self) -> pd.DataFrame:
-        """Carrega dados dos arquivos Excel"""
+        """Carrega dados dos arquivos Excel (ou do cache em disco de cada arquivo)"""
         logger.info("🔄 Carregando dados dos arquivos Excel...")
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        all_files_raw = glob.glob(f"{self.data_path}/*.xlsx")
+        entries, temp_count = self._scan_excel_files()
         
-        # Filtrar arquivos temporários do Excel
-        temp_files = [f for f in all_files_raw if os.path.basename(f).startswith('~$')]
-        all_files = [f for f in all_files_raw if not os.path.basename(f).startswith('~$')]
+        if temp_count:
+            logger.info(f"🗑️  Ignorando {temp_count} arquivo(s) temporário(s) do Excel")
         
-        if temp_files:
-            logger.info(f"🗑️  Ignorando {len(temp_files)} arquivo(s) temporário(s) do Excel")
+        logger.info(f"📁 Encontrados {len(entries)} arquivos Excel válidos")
         
-        logger.info(f"📁 Encontrados {len(all_files)} arquivos Excel válidos")
-        
-        if not all_files:
+        if not entries:
             raise ValueError("Nenhum arquivo Excel válido encontrado na pasta CicloDetalhado")
         
-        df_list = []
-        total_rows = 0
+        # Cada arquivo tem seu próprio cache em disco: quando apenas um arquivo
+        # muda (ex.: o do ano corrente), só ele precisa ser lido novamente
+        cache_paths = [self._get_disk_cache_path(entry) for entry in entries]
+        
+        # Dados já processados desta versão dos arquivos (após reinícios): sem
+        # combinar nem converter as colunas novamente
+        processed_cache_path = self._get_processed_cache_path(cache_paths)
+        combined_df = self._load_processed_cache(processed_cache_path)
+        if combined_df is not None:
+            total_time = time.perf_counter() - start_time
+            logger.info(f"📦 Dados processados carregados do cache em disco")
+            logger.info(f"   📈 Total de registros: {len(combined_df):,}")
+            logger.info(f"   ⏱️  Tempo total: {total_time:.2f}s")
+            return combined_df
+        
+        df_list: list = [self._load_disk_cache(cache_path) for cache_path in cache_paths]
+        pending = [i for i, df in enumerate(df_list) if df is None]
+        
+        cached_count = len(entries) - len(pending)
+        if cached_count:
+            logger.info(f"📦 {cached_count} arquivo(s) carregado(s) do cache em disco")
+        
+        # Detalhes por arquivo apenas em nível DEBUG (sem formatar as mensagens à toa)
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, df in enumerate(df_list):
+                if df is not None:
+                    logger.debug(f"📦 Arquivo {i + 1}/{len(entries)} carregado do cache em disco: {entries[i].name} ({len(df):,} linhas)")
         
-        for i, filename in enumerate(all_files, 1):
-            logger.info(f"📊 Carregando arquivo {i}/{len(all_files)}: {filename}")
-            file_start = time.time()
+        if pending:
+            # Cada arquivo é independente: carregar em paralelo, um processo por arquivo.
+            # Com um único arquivo (ou CPU) não há paralelismo a ganhar: ler em uma
+            # thread evita criar o processo e serializar o DataFrame de volta
+            max_workers = min(len(pending), os.cpu_count() or 1)
+            if max_workers > 1:
+                executor_class = ProcessPoolExecutor
+                logger.info(f"⚙️  Carregando {len(pending)} arquivo(s) com {max_workers} processo(s) em paralelo")
+            else:
+                executor_class = ThreadPoolExecutor
+                logger.info(f"⚙️  Carregando {len(pending)} arquivo(s) no processo atual")
             
-            try:
-                # Carregar as colunas necessárias
-                df = pd.read_excel(
-                    filename, 
-                    usecols=[
-                        'DataHoraInicio', 'Tipo Input', 'Massa', 
-                        'Tipo de atividade', 'Especificacao de material', 
-                        'Material', 'Tag carga', 'Frota carga', 'Frota transporte',
-                        'Operando vazio', 'Fila carga', 'Manobra carga', 'Carga',
-                        'Operando cheio', 'Fila Descarga', 'Manobra descarga', 'Descarga'
-                    ]
-                )
-                rows = len(df)
-                total_rows += rows
-                df_list.append(df)
-                file_time = time.time() - file_start
-                logger.info(f"   ✅ Carregado: {rows:,} linhas em {file_time:.2f}s")
-            except Exception as e:
-                logger.error(f"   ❌ Erro ao carregar {filename}: {e}")
-                raise
+            with executor_class(max_workers=max_workers) as executor:
+                futures = [executor.submit(_read_excel_file, entries[i].path) for i in pending]
+                
+                for i, future in zip(pending, futures):
+                    filename = entries[i].path
+                    logger.debug(f"📊 Carregando arquivo {i + 1}/{len(entries)}: {filename}")
+                    
+                    try:
+                        df, file_time = future.result()
+                        df_list[i] = df
+                        logger.info(f"   ✅ Carregado: {len(df):,} linhas em {file_time:.2f}s")
+                    except Exception as e:
+                        logger.error(f"   ❌ Erro ao carregar {filename}: {e}")
+                        raise
+                    
+                    self._save_disk_cache(df, cache_paths[i])
+        
+        # Remover caches de versões antigas dos arquivos
+        self._remove_disk_cache(keep={*cache_paths, processed_cache_path})
         
         logger.info(f"🔀 Combinando {len(df_list)} DataFrames...")
-        combine_start = time.time()
+        combine_start = time.perf_counter()
         combined_df = pd.concat(df_list, ignore_index=True)
-        combine_time = time.time() - combine_start
+        combine_time = time.perf_counter() - combine_start
+        
+        # Validar o esquema uma única vez na carga: os services usam as colunas sem
+        # verificá-las a cada requisição
+        missing_columns = [col for col in EXCEL_COLUMNS if col not in combined_df.columns]
+        if missing_columns:
+            raise ValueError(f"Colunas não encontradas nos dados: {', '.join(missing_columns)}")
+        
+        # Converter após combinar, para que todos os arquivos compartilhem as mesmas categorias;
+        # espaços nas bordas são removidos aqui, uma única vez, e não a cada requisição
+        for col in CATEGORY_COLUMNS:
+            combined_df[col] = combined_df[col].astype('category')
+        for col in STRIPPED_CATEGORY_COLUMNS:
+            combined_df[col] = self._strip_categories(combined_df[col])
         
-        total_time = time.time() - start_time
+        # Converter datas uma única vez na carga (e não a cada requisição) e ordenar
+        # por data, o que permite filtrar períodos por busca binária
+        combined_df['DataHoraInicio'] = self._parse_data_hora(combined_df['DataHoraInicio'])
+        invalid_dates = combined_df['DataHoraInicio'].isna().sum()
+        if invalid_dates:
+            logger.warning(f"⚠️ Ignorando {invalid_dates:,} registro(s) com DataHoraInicio inválida")
+        combined_df = (
+            combined_df.dropna(subset=['DataHoraInicio'])
+            .sort_values('DataHoraInicio', kind='stable')
+            .reset_index(drop=True)
+        )
+        
+        # Chave inteira do mês (ano * 12 + mês - 1) usada nos agrupamentos mensais,
+        # calculada uma única vez em vez de um PeriodArray a cada requisição
+        datas = combined_df['DataHoraInicio'].dt
+        combined_df['AnoMes'] = (datas.year * 12 + datas.month - 1).astype('int32')
+        
+        combined_df['Massa'] = self._downcast_massa(combined_df['Massa'])
+        
+        # Converter os tempos do ciclo de texto para minutos uma única vez na carga
+        # (em vez de interpretar as strings a cada requisição)
+        for col in TIME_COLUMNS:
+            combined_df[col] = self._convert_times_to_minutes(combined_df[col])
+        
+        self._save_disk_cache(combined_df, processed_cache_path)
+        
+        total_time = time.perf_counter() - start_time
         logger.info(f"✅ Dados carregados com sucesso!")
         logger.info(f"   📈 Total de registros: {len(combined_df):,}")
         logger.info(f"   ⏱️  Tempo de combinação: {combine_time:.2f}s")
@@ -96,42 +412,224 @@ class CycleRepository:
         
         return combined_df
     
+    @staticmethod
+    def _parse_data_hora(values: pd.Series) -> pd.Series:
+        """Converte a coluna DataHoraInicio para datetime64 (inválidas viram NaT)"""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        
+        if pd.api.types.is_numeric_dtype(values):
+            # Células de data do Excel lidas como número de série (dias desde 1899-12-30):
+            # conversão aritmética vetorizada, sem parse de texto
+            return pd.to_datetime(
+                values, unit='D', origin=EXCEL_EPOCH, errors='coerce'
+            ).dt.round('ms')  # remove o erro de ponto flutuante da fração do dia
+        
+        return pd.to_datetime(values, format=DATA_HORA_FORMAT, errors='coerce')
+    
+    @staticmethod
+    def _strip_categories(values: pd.Series) -> pd.Series:
+        """Remove espaços nas bordas dos rótulos de uma coluna category.
+
+        Trabalha sobre as categorias (poucas dezenas), não sobre as linhas: rótulos
+        que ficam iguais após o strip (ex.: 'CARB HG ' e 'CARB HG') são unificados
+        remapeando os códigos.
+        """
+        categorias = values.cat.categories
+        if not pd.api.types.is_string_dtype(categorias):
+            return values
+        
+        limpas = categorias.str.strip()
+        if limpas.equals(categorias):
+            return values
+        
+        unicas = limpas.unique()
+        novos_codigos = unicas.get_indexer(limpas)
+        codigos = values.cat.codes.to_numpy()
+        codigos = np.where(codigos >= 0, novos_codigos[codigos], -1)
+        return pd.Series(pd.Categorical.from_codes(codigos, categories=unicas), index=values.index, name=values.name)
+    
+    @staticmethod
+    def _downcast_massa(values: pd.Series) -> pd.Series:
+        """Armazena a Massa no menor tipo inteiro possível, quando todos os valores são inteiros.
+
+        As somas continuam exatas (o pandas acumula inteiros em 64 bits), mas cada
+        agrupamento lê 1-2 bytes por linha em vez de 8. Com valores fracionários
+        a coluna é mantida como está (float32 perderia precisão nos totais).
+        """
+        if not pd.api.types.is_numeric_dtype(values):
+            return values
+        
+        validos = values.dropna().to_numpy(dtype='float64')
+        if len(validos) == 0 or not np.all(np.mod(validos, 1) == 0):
+            return values
+        
+        menor, maior = int(validos.min()), int(validos.max())
+        tipo = np.promote_types(np.min_scalar_type(menor), np.min_scalar_type(maior))
+        return values.astype(pd.ArrowDtype(pa.from_numpy_dtype(tipo)))
+    
+    @staticmethod
+    def _convert_times_to_minutes(values: pd.Series) -> pd.Series:
+        """Converte uma coluna de tempos (HH:MM:SS) para minutos (float) de forma vetorizada.
+
+        Valores nulos continuam nulos; os demais valores fora do formato HH:MM:SS
+        seguem as regras de _convert_time_to_minutes.
+        """
+        if pd.api.types.is_numeric_dtype(values):
+            return values.astype('float64')
+        
+        try:
+            texto = pa.array(values.astype(pd.ArrowDtype(pa.string())))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Tipos misturados na coluna (ex.: texto e datetime.time): conversão item a item
+            return values.map(_convert_time_to_minutes).where(values.notna())
+        
+        # Separar horas, minutos e segundos com o regex do Arrow (em C++, sem
+        # chamar uma função Python por linha)
+        partes = pc.extract_regex(texto, TIME_PATTERN)
+        horas, minutos, segundos = (
+            pc.cast(pc.struct_field(partes, [i]), pa.float64()).to_numpy(zero_copy_only=False)
+            for i in range(3)
+        )
+        result = pd.Series(horas * 60 + minutos + segundos / 60, index=values.index)
+        
+        # Valores fora do formato HH:MM:SS (MM:SS, números, vazios): conversão item a item
+        fora_do_formato = result.isna() & values.notna()
+        if fora_do_formato.any():
+            result[fora_do_formato] = values[fora_do_formato].map(_convert_time_to_minutes)
+        
+        return result
+    
     def get_raw_data(self) -> pd.DataFrame:
         """Obtém dados brutos com cache inteligente"""
         current_hash = self._get_files_hash()
-        current_time = datetime.now()
+        
+        # Ler dados e hash juntos (sem ver uma troca de cache pela metade)
+        with self._cache_lock:
+            raw_data, files_hash = self._cache['raw_data'], self._cache['files_hash']
         
         # Se tem cache válido, usar
-        if (self._cache['raw_data'] is not None and 
-            self._cache['files_hash'] == current_hash):
-            logger.info("✅ Usando dados do cache (arquivos não modificados)")
-            return self._cache['raw_data']
+        if raw_data is not None and files_hash == current_hash:
+            logger.debug("✅ Usando dados do cache (arquivos não modificados)")
+            return raw_data
         
-        logger.info("🔄 Cache inválido ou inexistente, carregando dados...")
+        with self._load_lock:
+            # Outra requisição pode ter carregado os dados enquanto aguardávamos
+            if (self._cache['raw_data'] is not None and
+                self._cache['files_hash'] == current_hash):
+                logger.info("✅ Usando dados do cache (carregados por outra requisição)")
+                return self._cache['raw_data']
+            
+            logger.info("🔄 Cache inválido ou inexistente, carregando dados...")
+            
+            # Carregar dados (cache em disco evita reprocessar os arquivos Excel após reinícios)
+            raw_data = self._load_excel_files()
+            
+            # Atualizar cache (resultados processados dos dados antigos deixam de valer).
+            # O DataFrame em cache é compartilhado entre requisições e tratado como
+            # imutável: com Copy-on-Write, alterações feitas pelos services ficam na
+            # cópia de cada requisição
+            with self._cache_lock:
+                self._cache['raw_data'] = raw_data
+                self._cache['processed_data'] = None
+                self._cache['files_hash'] = current_hash
+                self._cache['last_check'] = datetime.now()
+            logger.info("💾 Cache atualizado")
         
-        # Carregar dados
-        raw_data = self._load_excel_files()
+        return raw_data
+    
+    def warm_up(self) -> None:
+        """Pré-carrega os dados no cache (executado em segundo plano na inicialização)"""
+        try:
+            start_time = time.perf_counter()
+            self.get_raw_data()
+            logger.info(f"🔥 Cache pré-carregado em {time.perf_counter() - start_time:.2f}s")
+        except Exception as e:
+            logger.error(f"❌ Erro ao pré-carregar cache: {e}")
+    
+    def get_processed_data(self, key: str) -> Optional[Any]:
+        """Obtém um resultado processado do cache, se os arquivos não mudaram"""
+        current_hash = self._get_files_hash()
+        with self._cache_lock:
+            processed = self._cache['processed_data']
+            if processed is None or key not in processed:
+                return None
+            
+            if self._cache['files_hash'] != current_hash:
+                return None
+            
+            processed.move_to_end(key)
+            return processed[key]
+    
+    def set_processed_data(self, key: str, value: Any) -> None:
+        """Guarda um resultado processado no cache (descartando os mais antigos)"""
+        with self._cache_lock:
+            if self._cache['processed_data'] is None:
+                self._cache['processed_data'] = OrderedDict()
+            
+            processed = self._cache['processed_data']
+            processed[key] = value
+            processed.move_to_end(key)
+            while len(processed) > PROCESSED_CACHE_MAX_ENTRIES:
+                processed.popitem(last=False)
+    
+    def get_or_compute_processed_data(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Obtém um resultado processado do cache ou o calcula uma única vez.
+
+        Requisições simultâneas para a mesma chave aguardam o cálculo em andamento
+        em vez de repetir o processamento. O lock da chave só é descartado quando
+        nenhuma requisição o usa mais: quem chega enquanto outras aguardam recebe
+        sempre o mesmo lock.
+        """
+        value = self.get_processed_data(key)
+        if value is not None:
+            logger.debug(f"✅ Usando resultado processado do cache: {key}")
+            return value
         
-        # Atualizar cache
-        self._cache['raw_data'] = raw_data
-        self._cache['files_hash'] = current_hash
-        self._cache['last_check'] = current_time
-        logger.info("💾 Cache atualizado")
+        with self._processed_locks_guard:
+            entry = self._processed_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        key_lock = entry[0]
         
-        return raw_data
+        try:
+            with key_lock:
+                # Outra requisição pode ter calculado o resultado enquanto aguardávamos
+                value = self.get_processed_data(key)
+                if value is None:
+                    # Garantir os dados carregados antes de ler o hash: após a
+                    # inicialização ou clear_cache ele ainda é None, e o cálculo
+                    # (que carrega os dados) nunca seria guardado
+                    self.get_raw_data()
+                    with self._cache_lock:
+                        files_hash = self._cache['files_hash']
+                    value = compute()
+                    # Não guardar um resultado calculado sobre dados que foram
+                    # recarregados durante o cálculo
+                    with self._cache_lock:
+                        if self._cache['files_hash'] == files_hash:
+                            self.set_processed_data(key, value)
+                return value
+        finally:
+            with self._processed_locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._processed_locks[key]
     
     def clear_cache(self) -> Dict[str, Any]:
         """Limpa o cache e retorna informações sobre o estado anterior"""
         logger.info("🗑️  Limpando cache...")
         
-        old_cache = self._cache.copy()
-        self._cache['raw_data'] = None
-        self._cache['processed_data'] = None
-        self._cache['files_hash'] = None
-        self._cache['last_check'] = None
-        
-        had_data = old_cache['raw_data'] is not None
-        had_processed = old_cache['processed_data'] is not None
+        with self._cache_lock:
+            had_data = self._cache['raw_data'] is not None
+            had_processed = self._cache['processed_data'] is not None
+            self._cache['raw_data'] = None
+            self._cache['processed_data'] = None
+            self._cache['files_hash'] = None
+            self._cache['last_check'] = None
+            self._cache['dir_mtime'] = None
+            self._cache['dir_checked_at'] = None
+            self._cache['current_files_hash'] = None
+        self._remove_disk_cache()
         
         logger.info("✅ Cache limpo com sucesso!")
         
@@ -153,82 +651,41 @@ class CycleRepository:
                            self._cache['files_hash'] == self._get_files_hash())
         }
     
-    def get_available_tipos_input(self) -> list:
-        """Obtém valores únicos da coluna 'Tipo Input' para filtros"""
-        try:
+    def _get_available_values(self, column: str) -> list:
+        """Obtém valores únicos (ordenados e sem nulos) de uma coluna para filtros.
+
+        A lista depende apenas dos dados carregados: é calculada uma vez e guardada
+        no cache de resultados processados, sendo descartada quando os arquivos mudam.
+        """
+        def compute() -> list:
             df = self.get_raw_data()
             
-            if 'Tipo Input' not in df.columns:
-                logger.warning("⚠️ Coluna 'Tipo Input' não encontrada nos dados")
-                return []
-            
             # Obter valores únicos, ordenados e sem valores nulos
-            valores_unicos = df['Tipo Input'].dropna().unique().tolist()
+            valores_unicos = df[column].dropna().unique().tolist()
             valores_unicos.sort()
-            
-            logger.info(f"✅ Valores únicos obtidos para 'Tipo Input': {len(valores_unicos)} valores")
+            return valores_unicos
+        
+        try:
+            valores_unicos = self.get_or_compute_processed_data(f"available_values:{column}", compute)
+            logger.debug(f"✅ Valores únicos obtidos para '{column}': {len(valores_unicos)} valores")
             return valores_unicos
             
         except Exception as e:
-            logger.error(f"❌ Erro ao obter valores únicos de 'Tipo Input': {str(e)}")
+            logger.error(f"❌ Erro ao obter valores únicos de '{column}': {str(e)}")
             return []
+    
+    def get_available_tipos_input(self) -> list:
+        """Obtém valores únicos da coluna 'Tipo Input' para filtros"""
+        return self._get_available_values('Tipo Input')
 
     def get_available_frota_transporte(self) -> list:
         """Obtém valores únicos da coluna 'Frota transporte' para filtros"""
-        try:
-            df = self.get_raw_data()
-            
-            if 'Frota transporte' not in df.columns:
-                logger.warning("⚠️ Coluna 'Frota transporte' não encontrada nos dados")
-                return []
-            
-            # Obter valores únicos, ordenados e sem valores nulos
-            valores_unicos = df['Frota transporte'].dropna().unique().tolist()
-            valores_unicos.sort()
-            
-            logger.info(f"✅ Valores únicos obtidos para 'Frota transporte': {len(valores_unicos)} valores")
-            return valores_unicos
-            
-        except Exception as e:
-            logger.error(f"❌ Erro ao obter valores únicos de 'Frota transporte': {str(e)}")
-            return []
+        return self._get_available_values('Frota transporte')
 
     def get_available_frota_carga(self) -> list:
         """Obtém valores únicos da coluna 'Frota carga' para filtros"""
-        try:
-            df = self.get_raw_data()
-            
-            if 'Frota carga' not in df.columns:
-                logger.warning("⚠️ Coluna 'Frota carga' não encontrada nos dados")
-                return []
-            
-            # Obter valores únicos, ordenados e sem valores nulos
-            valores_unicos = df['Frota carga'].dropna().unique().tolist()
-            valores_unicos.sort()
-            
-            logger.info(f"✅ Valores únicos obtidos para 'Frota carga': {len(valores_unicos)} valores")
-            return valores_unicos
-            
-        except Exception as e:
-            logger.error(f"❌ Erro ao obter valores únicos de 'Frota carga': {str(e)}")
-            return []
+        return self._get_available_values('Frota carga')
 
     def get_available_tag_carga(self) -> list:
         """Obtém valores únicos da coluna 'Tag carga' para filtros"""
-        try:
-            df = self.get_raw_data()
-            
-            if 'Tag carga' not in df.columns:
-                logger.warning("⚠️ Coluna 'Tag carga' não encontrada nos dados")
-                return []
-            
-            # Obter valores únicos, ordenados e sem valores nulos
-            valores_unicos = df['Tag carga'].dropna().unique().tolist()
-            valores_unicos.sort()
-            
-            logger.info(f"✅ Valores únicos obtidos para 'Tag carga': {len(valores_unicos)} valores")
-            return valores_unicos
-            
-        except Exception as e:
-            logger.error(f"❌ Erro ao obter valores únicos de 'Tag carga': {str(e)}")
-            return []
+        return self._get_available_values('Tag carga')
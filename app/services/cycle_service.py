@@ -1,15 +1,195 @@
+import functools
+import gzip
+import hashlib
+import json
 import logging
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic import TypeAdapter
 
 from app.dto.cycle_dto import DateRangeDTO
-from app.repositories.cycle_repository import CycleRepository
+from app.repositories.cycle_repository import TIME_COLUMNS, CycleRepository
 
 logger = logging.getLogger(__name__)
 
+# Colunas usadas por _apply_filters
+FILTER_COLUMNS = ['DataHoraInicio', 'Tipo Input', 'Frota transporte', 'Frota carga', 'Tag carga']
+
+# Cubo pré-agregado de produção (ver _get_production_cube): dia (Dia) + AnoMes + colunas
+# de filtro + colunas de agrupamento dos gráficos de produção
+PRODUCTION_CUBE_CACHE_KEY = 'production_cube'
+PRODUCTION_CUBE_COLUMNS = [
+    'AnoMes', 'Tipo Input', 'Frota transporte', 'Frota carga', 'Tag carga',
+    'Tipo de atividade', 'Especificacao de material', 'Material'
+]
+
+# Filtros por categoria do DateRangeDTO e as colunas correspondentes
+CATEGORY_FILTERS = [
+    ('tipos_input', 'Tipo Input'),
+    ('frota_transporte', 'Frota transporte'),
+    ('frota_carga', 'Frota carga'),
+    ('tag_carga', 'Tag carga')
+]
+
+# Limite de células (períodos x categorias) para a soma densa em _sum_by_key_and_code
+DENSE_GROUPBY_MAX_CELLS = 1_000_000
+
+# Esquema da produtividade por equipamento em Arrow (mesmos campos do EquipmentProductivityDTO)
+PRODUCTIVITY_BY_EQUIPMENT_SCHEMA = pa.schema([
+    ('data', pa.string()),
+    ('equipamento', pa.string()),
+    ('toneladas_por_hora', pa.float64()),
+    ('total_toneladas', pa.float64()),
+    ('horas_trabalhadas', pa.float64())
+])
+
+
+def _format_ano_mes(ano_mes: pd.Series) -> pd.Series:
+    """Converte a chave inteira AnoMes (ano * 12 + mês - 1) para 'YYYY-MM'"""
+    return pd.Series(
+        [f"{chave // 12:04d}-{chave % 12 + 1:02d}" for chave in ano_mes.tolist()],
+        index=ano_mes.index, dtype=object
+    )
+
+
+def _filters_cache_key(filters: DateRangeDTO) -> str:
+    """Chave de cache dos filtros, independente da ordem dos valores selecionados.
+
+    Listas vazias equivalem a nenhum filtro e as listas são ordenadas, para que
+    combinações equivalentes de filtros compartilhem o mesmo resultado.
+    """
+    valores = {
+        campo: sorted(valor) if isinstance(valor, list) else valor
+        for campo, valor in filters.model_dump().items()
+    }
+    return json.dumps({campo: valor or None for campo, valor in valores.items()}, sort_keys=True)
+
+
+def _response_payload(body: bytes) -> Tuple[bytes, bytes, str]:
+    """Retorna o corpo da resposta, sua versão em gzip e o ETag calculado sobre o conteúdo"""
+    body_gzip = gzip.compress(body, compresslevel=6)
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    return body, body_gzip, etag
+
+
+def _cached_by_filters(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Guarda o resultado do endpoint no cache de resultados processados, por combinação de filtros.
+
+    Requisições repetidas (recarga da página, vários gráficos com os mesmos filtros)
+    são respondidas sem reprocessar os dados; o cache é descartado quando os
+    arquivos mudam. O resultado é compartilhado entre requisições e não deve ser
+    alterado por quem o recebe.
+    """
+    @functools.wraps(method)
+    def wrapper(self, filters: DateRangeDTO):
+        cache_key = f"{method.__name__}:{_filters_cache_key(filters)}"
+        return self.cycle_repository.get_or_compute_processed_data(
+            cache_key, lambda: method(self, filters)
+        )
+    return wrapper
+
+
+def _count_by_month(ano_mes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Conta registros por mês e retorna (AnoMes, contagens) apenas dos meses com registros.
+
+    Contagem com bincount sobre a chave inteira do mês (uma passada em C sobre os
+    dados, sem o groupby genérico por hash).
+    """
+    primeiro_mes = int(ano_mes.min())
+    counts = np.bincount(ano_mes - primeiro_mes)
+    
+    # Manter apenas os meses com registros (já ordenados)
+    com_registros = np.flatnonzero(counts)
+    return com_registros + primeiro_mes, counts[com_registros]
+
+
+def _sum_by_key_and_code(chaves: np.ndarray, categorias: pd.Series, massa: np.ndarray,
+                         contagens: Optional[np.ndarray] = None) -> Optional[pd.DataFrame]:
+    """Soma massa e conta ciclos por (chave inteira, categoria) num acumulador denso 2D.
+
+    A chave é um período inteiro (AnoMes ou dia). Cada linha vira um índice
+    (chave - primeira chave) * n_categorias + código e o bincount acumula massa e
+    contagem numa passada linear em C, sem a tabela de hash do groupby. Com
+    contagens (linhas já agregadas, como as do cubo de produção) cada linha soma a
+    sua contagem em vez de 1. Linhas com categoria nula são ignoradas, como no
+    groupby. Retorna None quando a coluna não é categórica, não há linhas com
+    categoria ou a grade (chaves x categorias) ficaria grande demais; nesse caso
+    usa-se o groupby.
+    """
+    if not isinstance(categorias.dtype, pd.CategoricalDtype):
+        return None
+    
+    codigos = categorias.cat.codes.to_numpy()
+    if (codigos < 0).any():
+        # Código -1 (nulo) apontaria para a célula de outra categoria
+        validos = codigos >= 0
+        chaves, codigos, massa = chaves[validos], codigos[validos], massa[validos]
+        if contagens is not None:
+            contagens = contagens[validos]
+    if len(codigos) == 0:
+        return None
+    
+    primeira_chave = int(chaves.min())
+    n_chaves = int(chaves.max()) - primeira_chave + 1
+    n_codigos = len(categorias.cat.categories)
+    if n_chaves * n_codigos > DENSE_GROUPBY_MAX_CELLS:
+        return None
+    
+    indices = (chaves.astype(np.int64) - primeira_chave) * n_codigos + codigos
+    tamanho = n_chaves * n_codigos
+    if contagens is None:
+        counts = np.bincount(indices, minlength=tamanho)
+    else:
+        counts = np.bincount(indices, weights=contagens, minlength=tamanho).astype(np.int64)
+    somas = np.bincount(indices, weights=massa.astype(np.float64), minlength=tamanho)
+    
+    # Manter apenas as células com registros (já ordenadas por chave e código)
+    com_registros = np.flatnonzero(counts)
+    massa_total = somas[com_registros]
+    if np.issubdtype(massa.dtype, np.integer):
+        # Somas inteiras são exatas em float64 até 2**53
+        massa_total = massa_total.astype(np.int64)
+    
+    return pd.DataFrame({
+        'chave': com_registros // n_codigos + primeira_chave,
+        'categoria': pd.Categorical.from_codes(com_registros % n_codigos, dtype=categorias.dtype),
+        'massa_total': massa_total,
+        'count': counts[com_registros]
+    })
+
+
+def _selects_all_values(coluna: pd.Series, valores: List[str]) -> bool:
+    """Verifica se o filtro seleciona todos os valores possíveis de uma coluna category.
+
+    Nesse caso (e sem nulos na coluna) o filtro não remove nenhuma linha e a máscara
+    com isin pode ser dispensada.
+    """
+    if not isinstance(coluna.dtype, pd.CategoricalDtype):
+        return False
+    return set(coluna.cat.categories).issubset(valores) and not coluna.hasnans
+
+
+def _day_number(data: str) -> int:
+    """Converte uma data (YYYY-MM-DD) para o número do dia (dias desde 1970)"""
+    return int(np.datetime64(data, 'D').astype(np.int64))
+
+
+def _production_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte linhas brutas para o formato do cubo de produção, sem agregá-las.
+
+    Cada ciclo vira uma linha com a sua massa e contagem 1: as somas feitas sobre o
+    cubo dão o mesmo resultado.
+    """
+    df = df.loc[:, ['DataHoraInicio', 'Massa'] + PRODUCTION_CUBE_COLUMNS].dropna(subset=['Massa', 'Tipo Input'])
+    dias = df['DataHoraInicio'].to_numpy().astype('datetime64[D]').astype(np.int32)
+    return df.drop(columns='DataHoraInicio').rename(columns={'Massa': 'massa_total'}).assign(Dia=dias, count=1)
+
 
 class CycleService:
     """Service para processamento de dados de ciclo com lógica de negócio"""
@@ -19,71 +199,132 @@ class CycleService:
     
     def _apply_filters(self, df: pd.DataFrame, filters: DateRangeDTO) -> pd.DataFrame:
         """Aplica filtros aos dados"""
-        logger.info("🔄 Aplicando filtros aos dados...")
-        
-        # Verificar se a coluna DataHoraInicio existe
-        if 'DataHoraInicio' not in df.columns:
-            raise ValueError('Coluna DataHoraInicio não encontrada nos dados')
-        
-        # Converter datas
-        df['DataHoraInicio'] = pd.to_datetime(df['DataHoraInicio'], errors='coerce')
-        df = df.dropna(subset=['DataHoraInicio'])
-        
-        # Aplicar filtros de data
-        if filters.data_inicio:
-            data_inicio_dt = pd.to_datetime(filters.data_inicio)
-            df = df[df['DataHoraInicio'] >= data_inicio_dt]
-            logger.info(f"📅 Aplicado filtro de data início: {filters.data_inicio}")
-        
-        if filters.data_fim:
-            data_fim_dt = pd.to_datetime(filters.data_fim)
-            df = df[df['DataHoraInicio'] <= data_fim_dt]
-            logger.info(f"📅 Aplicado filtro de data fim: {filters.data_fim}")
-        
-        # Aplicar filtro por tipos de input
-        if filters.tipos_input and len(filters.tipos_input) > 0:
-            if 'Tipo Input' in df.columns:
-                df = df[df['Tipo Input'].isin(filters.tipos_input)]
-                logger.info(f"🔍 Aplicado filtro de Tipo Input: {filters.tipos_input}")
-                logger.info(f"📊 Registros após filtro de Tipo Input: {len(df):,}")
-        
-        # Aplicar filtro por frota de transporte
-        if filters.frota_transporte and len(filters.frota_transporte) > 0:
-            if 'Frota transporte' in df.columns:
-                df = df[df['Frota transporte'].isin(filters.frota_transporte)]
-                logger.info(f"🔍 Aplicado filtro de Frota de Transporte: {filters.frota_transporte}")
-                logger.info(f"📊 Registros após filtro de Frota de Transporte: {len(df):,}")
-        
-        # Aplicar filtro por frota de carga
-        if filters.frota_carga and len(filters.frota_carga) > 0:
-            if 'Frota carga' in df.columns:
-                df = df[df['Frota carga'].isin(filters.frota_carga)]
-                logger.info(f"🔍 Aplicado filtro de Frota de Carga: {filters.frota_carga}")
-                logger.info(f"📊 Registros após filtro de Frota de Carga: {len(df):,}")
-        
-        # Aplicar filtro por tag de carga
-        if filters.tag_carga and len(filters.tag_carga) > 0:
-            if 'Tag carga' in df.columns:
-                df = df[df['Tag carga'].isin(filters.tag_carga)]
-                logger.info(f"🔍 Aplicado filtro de Tag de Carga: {filters.tag_carga}")
-                logger.info(f"📊 Registros após filtro de Tag de Carga: {len(df):,}")
-            else:
-                logger.warning("⚠️ Coluna 'Tag carga' não encontrada para aplicar filtro")
-        
-        logger.info(f"📊 Registros após filtros: {len(df):,}")
+        logger.debug("🔄 Aplicando filtros aos dados...")
+        
+        # Aplicar filtros de data: DataHoraInicio já vem convertida e ordenada do
+        # repository, então o período é uma fatia contínua encontrada por busca binária
+        if filters.data_inicio or filters.data_fim:
+            datas = df['DataHoraInicio']
+            inicio = 0
+            fim = len(df)
+            
+            if filters.data_inicio:
+                inicio = datas.searchsorted(pd.to_datetime(filters.data_inicio), side='left')
+                logger.debug(f"📅 Aplicado filtro de data início: {filters.data_inicio}")
+            
+            if filters.data_fim:
+                fim = datas.searchsorted(pd.to_datetime(filters.data_fim), side='right')
+                logger.debug(f"📅 Aplicado filtro de data fim: {filters.data_fim}")
+            
+            df = df.iloc[inicio:fim]
+        
+        # Aplicar filtros por categoria (Tipo Input, frotas e tag de carga): as máscaras
+        # são combinadas e o DataFrame é recortado uma única vez, em vez de copiar
+        # todas as colunas a cada filtro
+        mascara = None
+        for campo, coluna in CATEGORY_FILTERS:
+            valores = getattr(filters, campo)
+            if valores and not _selects_all_values(df[coluna], valores):
+                filtro = df[coluna].isin(valores).to_numpy()
+                mascara = filtro if mascara is None else mascara & filtro
+                logger.debug(f"🔍 Aplicado filtro de {coluna}: {valores}")
+        
+        if mascara is not None:
+            df = df[mascara]
+        
+        logger.debug(f"📊 Registros após filtros: {len(df):,}")
         
         if len(df) == 0:
             logger.warning("⚠️ Nenhum registro encontrado após aplicar filtros")
         
         return df
     
+    def _get_production_cube(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Obtém o cubo de produção (massa total e quantidade de ciclos por dia, AnoMes e
+        categorias) junto com os dados brutos a partir dos quais foi agregado.
+
+        Agregado uma vez a partir dos dados brutos (poucos milhares de linhas contra
+        centenas de milhares) e guardado no cache de resultados processados, sendo
+        descartado quando os arquivos mudam. Considera apenas as linhas com Massa e
+        Tipo Input, que os gráficos de produção exigem; categorias nulas são mantidas
+        para que cada gráfico descarte apenas as da sua coluna. Os dados são obtidos
+        dentro do cálculo, para que o cubo nunca seja guardado sob o hash de outra
+        versão dos arquivos.
+        """
+        def compute() -> Tuple[pd.DataFrame, pd.DataFrame]:
+            logger.debug("🧊 Montando cubo de produção...")
+            df = self.cycle_repository.get_raw_data()
+            cube = _production_rows(df).groupby(
+                ['Dia'] + PRODUCTION_CUBE_COLUMNS, observed=True, dropna=False, sort=False
+            ).agg(
+                massa_total=('massa_total', 'sum'),
+                count=('count', 'size')
+            ).reset_index()
+            return df, cube
+        
+        return self.cycle_repository.get_or_compute_processed_data(PRODUCTION_CUBE_CACHE_KEY, compute)
+    
+    def _get_filtered_production_cube(self, filters: DateRangeDTO) -> pd.DataFrame:
+        """Obtém as linhas do cubo de produção que atendem aos filtros.
+
+        Os filtros de data têm precisão de dia (o DTO descarta o horário), então o
+        período corresponde a dias inteiros do cubo, mais os ciclos iniciados
+        exatamente à 00:00 de data_fim, que a comparação <= data_fim também inclui
+        e que são buscados nos mesmos dados brutos que deram origem ao cubo.
+        """
+        df, cube = self._get_production_cube()
+        
+        if filters.data_inicio or filters.data_fim:
+            dias = cube['Dia'].to_numpy()
+            no_periodo = np.ones(len(cube), dtype=bool)
+            if filters.data_inicio:
+                no_periodo &= dias >= _day_number(filters.data_inicio)
+            if filters.data_fim:
+                no_periodo &= dias < _day_number(filters.data_fim)
+            cube = cube[no_periodo]
+            
+            if filters.data_fim and (not filters.data_inicio or filters.data_inicio <= filters.data_fim):
+                datas = df['DataHoraInicio']
+                data_fim = pd.to_datetime(filters.data_fim)
+                meia_noite = df.iloc[datas.searchsorted(data_fim, side='left'):datas.searchsorted(data_fim, side='right')]
+                if len(meia_noite) > 0:
+                    cube = pd.concat([cube, _production_rows(meia_noite)], ignore_index=True)
+        
+        mascara = np.ones(len(cube), dtype=bool)
+        for campo, coluna in CATEGORY_FILTERS:
+            valores = getattr(filters, campo)
+            if valores and not _selects_all_values(cube[coluna], valores):
+                mascara &= cube[coluna].isin(valores).to_numpy()
+        return cube[mascara]
+    
+    def _get_production_from_cube(self, filters: DateRangeDTO, group_column: str) -> pd.DataFrame:
+        """Soma o cubo de produção por (AnoMes, group_column) aplicando os filtros"""
+        cube = self._get_filtered_production_cube(filters).dropna(subset=[group_column])
+        
+        if len(cube) == 0:
+            return cube
+        
+        production_data = _sum_by_key_and_code(
+            cube['AnoMes'].to_numpy(), cube[group_column],
+            cube['massa_total'].to_numpy(), cube['count'].to_numpy()
+        )
+        if production_data is None:
+            production_data = cube.groupby(['AnoMes', group_column], observed=True, sort=False).agg(
+                massa_total=('massa_total', 'sum'),
+                count=('count', 'sum')
+            ).reset_index()
+        return production_data
+    
+    @_cached_by_filters
     def get_cycles_by_year_month(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém dados de ciclos por ano/mês"""
-        logger.info("🔄 Processando dados de ciclos por ano/mês...")
-        process_start = time.time()
+        logger.debug("🔄 Processando dados de ciclos por ano/mês...")
+        process_start = time.perf_counter()
         
-        # Obter dados brutos
+        # Obter dados brutos (apenas as colunas de filtro e AnoMes, a única
+        # usada na contagem: as demais não precisam ser copiadas nos filtros)
         df = self.cycle_repository.get_raw_data()
+        df = df.loc[:, FILTER_COLUMNS + ['AnoMes']]
         
         # Aplicar filtros
         df = self._apply_filters(df, filters)
@@ -92,163 +333,159 @@ class CycleService:
             return []
         
         # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
-        
-        logger.info("📊 Agrupando dados...")
-        cycle_counts = df.groupby('AnoMes').size().reset_index(name='count')
-        
-        # Converter e ordenar
-        cycle_counts['AnoMes'] = cycle_counts['AnoMes'].astype(str)
-        cycle_counts = cycle_counts.sort_values('AnoMes')
+        logger.debug("📊 Contando ciclos por mês...")
+        ano_mes, counts = _count_by_month(df['AnoMes'].to_numpy())
+        periodos = _format_ano_mes(pd.Series(ano_mes))
         
         # Mapear campos para o formato esperado pelo DTO
         result = []
-        for _, row in cycle_counts.iterrows():
+        for periodo, count in zip(periodos, counts):
             result.append({
-                'ano_mes': row['AnoMes'],
-                'count': row['count']
+                'ano_mes': periodo,
+                'count': int(count)
             })
         
-        process_time = time.time() - process_start
-        logger.info(f"✅ Processamento concluído em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} períodos encontrados")
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Processamento concluído em {process_time:.2f}s")
+        logger.debug(f"📊 {len(result)} períodos encontrados")
         
         return result
     
+    def get_json(self, method: Callable[[DateRangeDTO], List[Dict[str, Any]]], filters: DateRangeDTO,
+                 adapter: TypeAdapter) -> Tuple[bytes, bytes, str]:
+        """Obtém o resultado de um endpoint validado e serializado em JSON pelo adapter informado.
+
+        Retorna o corpo puro e em gzip, com o ETag do conteúdo. Tudo fica no cache de
+        resultados processados (descartado quando os arquivos mudam): requisições
+        repetidas não validam, serializam nem comprimem o resultado novamente.
+        """
+        cache_key = f"{method.__name__}_json:{_filters_cache_key(filters)}"
+        return self.cycle_repository.get_or_compute_processed_data(
+            cache_key, lambda: _response_payload(adapter.dump_json(adapter.validate_python(method(filters))))
+        )
+    
+    @_cached_by_filters
     def get_cycles_by_type_input(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém dados de ciclos por tipo de input"""
-        logger.info("🔄 Processando dados de ciclos por tipo de input...")
-        process_start = time.time()
+        logger.debug("🔄 Processando dados de ciclos por tipo de input...")
+        process_start = time.perf_counter()
         
         # Obter dados brutos
         df = self.cycle_repository.get_raw_data()
         
-        # Verificar se a coluna Tipo Input existe
-        if 'Tipo Input' not in df.columns:
-            raise ValueError('Coluna Tipo Input não encontrada nos dados')
-        
         # Aplicar filtros
         df = self._apply_filters(df, filters)
         
         if len(df) == 0:
             return []
         
-        # Remover valores nulos em Tipo Input
-        df = df.dropna(subset=['Tipo Input'])
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
+        # Manter apenas as colunas usadas (a remoção de nulos copia só elas) e
+        # remover valores nulos em Tipo Input
+        df = df[['AnoMes', 'Tipo Input']].dropna(subset=['Tipo Input'])
         
-        logger.info("📊 Agrupando dados por Tipo Input...")
-        cycle_counts = df.groupby(['AnoMes', 'Tipo Input']).size().reset_index(name='count')
+        # Processar dados (AnoMes já vem calculado do repository)
+        logger.debug("📊 Agrupando dados por Tipo Input...")
+        cycle_counts = df.groupby(['AnoMes', 'Tipo Input'], observed=True, sort=False).size().reset_index(name='count')
         
-        # Converter período para string e ordenar
-        cycle_counts['AnoMes'] = cycle_counts['AnoMes'].astype(str)
+        # Converter período para string ('YYYY-MM') e ordenar
+        cycle_counts['AnoMes'] = _format_ano_mes(cycle_counts['AnoMes'])
         cycle_counts = cycle_counts.sort_values(['AnoMes', 'Tipo Input'])
         
         # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in cycle_counts.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'tipo_input': row['Tipo Input'],
-                'count': row['count']
-            })
+        result = cycle_counts.rename(columns={
+            'AnoMes': 'ano_mes',
+            'Tipo Input': 'tipo_input'
+        })[['ano_mes', 'tipo_input', 'count']].to_dict(orient='records')
         
-        process_time = time.time() - process_start
-        logger.info(f"✅ Processamento por Tipo Input concluído em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} registros encontrados")
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Processamento por Tipo Input concluído em {process_time:.2f}s")
+        logger.debug(f"📊 {len(result)} registros encontrados")
         
         return result
     
-    def get_production_by_activity_type(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
-        """Obtém dados de produção por tipo de atividade"""
-        logger.info("🔄 Processando dados de produção por tipo de atividade...")
-        process_start = time.time()
-        
-        # Obter dados brutos
-        df = self.cycle_repository.get_raw_data()
-        
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Tipo de atividade', 'Massa', 'Tipo Input']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
-        # Aplicar filtros
-        df = self._apply_filters(df, filters)
-        
-        if len(df) == 0:
+    def _get_production_by(self, filters: DateRangeDTO, group_column: str,
+                           output_field: str, descricao: str) -> List[Dict[str, Any]]:
+        """Obtém a produção mensal (massa total e quantidade de ciclos) agrupada por uma coluna"""
+        logger.debug(f"🔄 Processando dados de produção por {descricao}...")
+        process_start = time.perf_counter()
+        
+        # Colunas usadas (a presença de todas é validada na carga pelo repository)
+        required_columns = ['DataHoraInicio', group_column, 'Massa', 'Tipo Input']
+        
+        if group_column in PRODUCTION_CUBE_COLUMNS:
+            # O resultado sai do cubo pré-agregado, sem percorrer os dados brutos
+            logger.debug(f"🧊 Agrupando dados por {descricao} a partir do cubo...")
+            production_data = self._get_production_from_cube(filters, group_column)
+        else:
+            # Obter dados brutos e aplicar filtros
+            df = self.cycle_repository.get_raw_data()
+            df = self._apply_filters(df, filters)
+            
+            if len(df) == 0:
+                return []
+            
+            # Manter apenas as colunas usadas (a remoção de nulos copia só elas) e
+            # remover valores nulos
+            df = df[['AnoMes'] + required_columns].dropna(subset=required_columns)
+            
+            # Processar dados (AnoMes já vem calculado do repository)
+            logger.debug(f"📊 Agrupando dados por {descricao}...")
+            production_data = _sum_by_key_and_code(
+                df['AnoMes'].to_numpy(), df[group_column], df['Massa'].to_numpy()
+            )
+            if production_data is None:
+                production_data = df.groupby(['AnoMes', group_column], observed=True, sort=False).agg(
+                    massa_total=('Massa', 'sum'),
+                    count=('Massa', 'size')
+                ).reset_index()
+        
+        if len(production_data) == 0:
             return []
         
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Tipo de atividade', 'Massa', 'Tipo Input'])
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
-        
-        logger.info("📊 Agrupando dados por tipo de atividade...")
-        production_data = df.groupby(['AnoMes', 'Tipo de atividade']).agg({
-            'Massa': 'sum',
-            'DataHoraInicio': 'count'
-        }).reset_index()
+        production_data.columns = ['AnoMes', output_field, 'massa_total', 'count']
         
-        production_data.columns = ['AnoMes', 'Tipo de atividade', 'massa_total', 'count']
+        # A Massa é guardada como inteiro compacto quando possível, mas a massa total
+        # sai sempre como float: o tipo no JSON não depende dos valores dos arquivos
+        production_data['massa_total'] = production_data['massa_total'].astype('float64')
         
-        # Converter período para string e ordenar
-        production_data['AnoMes'] = production_data['AnoMes'].astype(str)
-        production_data = production_data.sort_values(['AnoMes', 'Tipo de atividade'])
+        # Converter período para string ('YYYY-MM') e ordenar
+        production_data['AnoMes'] = _format_ano_mes(production_data['AnoMes'])
+        production_data = production_data.sort_values(['AnoMes', output_field])
         
         # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in production_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'tipo_atividade': row['Tipo de atividade'],
-                'massa_total': row['massa_total'],
-                'count': row['count']
-            })
+        result = production_data.rename(columns={'AnoMes': 'ano_mes'})[
+            ['ano_mes', output_field, 'massa_total', 'count']
+        ].to_dict(orient='records')
         
-        process_time = time.time() - process_start
-        logger.info(f"✅ Processamento de produção concluído em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} registros encontrados")
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Processamento de produção por {descricao} concluído em {process_time:.2f}s")
+        logger.debug(f"📊 {len(result)} registros encontrados")
         
         return result
     
+    @_cached_by_filters
+    def get_production_by_activity_type(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
+        """Obtém dados de produção por tipo de atividade"""
+        return self._get_production_by(filters, 'Tipo de atividade', 'tipo_atividade', 'tipo de atividade')
+    
+    @_cached_by_filters
     def get_productivity_analysis(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém análise de produtividade"""
-        logger.info("🔄 Processando análise de produtividade...")
-        process_start = time.time()
-        
-        # Obter dados brutos
-        df = self.cycle_repository.get_raw_data()
-        
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Massa', 'Tipo Input']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
+        logger.debug("🔄 Processando análise de produtividade...")
+        process_start = time.perf_counter()
         
-        # Aplicar filtros
-        df = self._apply_filters(df, filters)
+        # Linhas do cubo de produção que atendem aos filtros (o cubo já considera
+        # apenas registros com Massa e Tipo Input)
+        cube = self._get_filtered_production_cube(filters)
         
-        if len(df) == 0:
+        if len(cube) == 0:
             return []
         
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Massa', 'Tipo Input'])
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
-        
-        logger.info("📊 Calculando produtividade...")
-        productivity_data = df.groupby('AnoMes').agg({
-            'Massa': 'sum',
-            'DataHoraInicio': 'count'
+        # Processar dados (AnoMes já vem calculado do repository)
+        logger.debug("📊 Calculando produtividade...")
+        productivity_data = cube.groupby('AnoMes').agg({
+            'massa_total': 'sum',
+            'count': 'sum'
         }).reset_index()
         
         productivity_data.columns = ['AnoMes', 'massa_total', 'count']
@@ -266,61 +503,60 @@ class CycleService:
         # Preencher NaN com 0 para o primeiro período
         productivity_data['crescimento_toneladas_pct'] = productivity_data['crescimento_toneladas_pct'].fillna(0)
         
-        # Converter período para string e ordenar
-        productivity_data['AnoMes'] = productivity_data['AnoMes'].astype(str)
+        # Converter período para string ('YYYY-MM') e ordenar
+        productivity_data['AnoMes'] = _format_ano_mes(productivity_data['AnoMes'])
         productivity_data = productivity_data.sort_values('AnoMes')
         
         # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in productivity_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'toneladas_total': row['massa_total'] / 1000,  # Converter kg para toneladas
-                'produtividade_media_ton_h': row['produtividade_media_ton_h'],
-                'crescimento_toneladas_pct': row['crescimento_toneladas_pct'],
-                'horas_trabalhadas': row['horas_trabalhadas']
-            })
+        productivity_data['toneladas_total'] = productivity_data['massa_total'] / 1000  # Converter kg para toneladas
+        result = productivity_data.rename(columns={'AnoMes': 'ano_mes'})[
+            ['ano_mes', 'toneladas_total', 'produtividade_media_ton_h',
+             'crescimento_toneladas_pct', 'horas_trabalhadas']
+        ].to_dict(orient='records')
         
-        process_time = time.time() - process_start
-        logger.info(f"✅ Análise de produtividade concluída em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} períodos encontrados")
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Análise de produtividade concluída em {process_time:.2f}s")
+        logger.debug(f"📊 {len(result)} períodos encontrados")
         
         return result
     
+    @_cached_by_filters
     def get_productivity_by_equipment(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém produtividade por equipamento"""
-        logger.info("🔄 Processando produtividade por equipamento...")
-        process_start = time.time()
+        logger.debug("🔄 Processando produtividade por equipamento...")
+        process_start = time.perf_counter()
         
         # Obter dados brutos
         df = self.cycle_repository.get_raw_data()
         
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Massa', 'Tag carga']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
         # Aplicar filtros
         df = self._apply_filters(df, filters)
         
         if len(df) == 0:
             return []
         
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Massa', 'Tag carga'])
+        # Manter apenas as colunas usadas (a remoção de nulos copia só elas) e
+        # remover valores nulos
+        df = df[['AnoMes', 'DataHoraInicio', 'Massa', 'Tag carga']].dropna(subset=['DataHoraInicio', 'Massa', 'Tag carga'])
         
-        # Processar dados
-        logger.info("📅 Criando datas...")
-        df['Data'] = df['DataHoraInicio'].dt.date.astype(str)
+        # Processar dados: agrupar pelo dia como inteiro (dias desde 1970, truncamento
+        # vetorizado) e formatar como texto apenas os dias do resultado, em vez de
+        # criar um objeto date e uma string por linha
+        logger.debug("📅 Criando datas...")
+        dias = df['DataHoraInicio'].to_numpy().astype('datetime64[D]').astype(np.int64)
         
-        logger.info("📊 Calculando produtividade por equipamento/dia...")
-        equipment_data = df.groupby(['Data', 'Tag carga']).agg({
-            'Massa': 'sum',
-            'DataHoraInicio': 'count'
-        }).reset_index()
+        logger.debug("📊 Calculando produtividade por equipamento/dia...")
+        equipment_data = _sum_by_key_and_code(dias, df['Tag carga'], df['Massa'].to_numpy())
+        if equipment_data is None:
+            equipment_data = df.assign(Data=dias).groupby(['Data', 'Tag carga'], observed=True, sort=False).agg(
+                massa_total=('Massa', 'sum'),
+                count=('Massa', 'size')
+            ).reset_index()
         
         equipment_data.columns = ['Data', 'Equipamento', 'massa_total', 'count']
+        equipment_data['Data'] = np.datetime_as_string(
+            equipment_data['Data'].to_numpy().astype('datetime64[D]'), unit='D'
+        )
         
         # Calcular horas trabalhadas (assumindo 24h por dia)
         equipment_data['horas_trabalhadas'] = 24
@@ -337,303 +573,69 @@ class CycleService:
         equipment_data = equipment_data.sort_values(['Data', 'Equipamento'])
         
         # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in equipment_data.iterrows():
-            result.append({
-                'data': row['Data'],
-                'equipamento': row['Equipamento'],
-                'toneladas_por_hora': row['toneladas_por_hora'],
-                'total_toneladas': row['total_toneladas'],
-                'horas_trabalhadas': row['horas_trabalhadas']
-            })
+        result = equipment_data.rename(columns={'Data': 'data', 'Equipamento': 'equipamento'})[
+            ['data', 'equipamento', 'toneladas_por_hora', 'total_toneladas', 'horas_trabalhadas']
+        ].to_dict(orient='records')
         
-        process_time = time.time() - process_start
-        logger.info(f"✅ Produtividade por equipamento concluída em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} registros encontrados")
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Produtividade por equipamento concluída em {process_time:.2f}s")
+        logger.debug(f"📊 {len(result)} registros encontrados")
         
         return result
     
+    def get_productivity_by_equipment_binary(self, filters: DateRangeDTO, formato: str) -> Tuple[bytes, bytes, str]:
+        """Obtém a produtividade por equipamento em formato colunar ('arrow' ou 'parquet'), puro e gzip, com o ETag"""
+        # Corpo da resposta em cache: requisições repetidas não serializam novamente
+        cache_key = f"productivity_by_equipment_{formato}:{_filters_cache_key(filters)}"
+        return self.cycle_repository.get_or_compute_processed_data(
+            cache_key, lambda: self._build_productivity_by_equipment_binary(filters, formato)
+        )
+    
+    def _build_productivity_by_equipment_binary(self, filters: DateRangeDTO, formato: str) -> Tuple[bytes, bytes, str]:
+        """Serializa a produtividade por equipamento como stream Arrow IPC ou arquivo Parquet"""
+        result = self.get_productivity_by_equipment(filters)
+        table = pa.Table.from_pylist(result, schema=PRODUCTIVITY_BY_EQUIPMENT_SCHEMA)
+        
+        sink = pa.BufferOutputStream()
+        if formato == 'parquet':
+            # Compactado (zstd), com dicionário nas colunas repetitivas (data e equipamento)
+            pq.write_table(table, sink, compression='zstd', use_dictionary=True)
+        else:
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        return _response_payload(sink.getvalue().to_pybytes())
+    
+    @_cached_by_filters
     def get_production_by_material_spec(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém dados de produção por especificação de material"""
-        logger.info("🔄 Processando dados de produção por especificação de material...")
-        process_start = time.time()
-        
-        # Obter dados brutos
-        df = self.cycle_repository.get_raw_data()
-        
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Especificacao de material', 'Massa', 'Tipo Input']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
-        # Aplicar filtros
-        df = self._apply_filters(df, filters)
-        
-        if len(df) == 0:
-            return []
-        
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Especificacao de material', 'Massa', 'Tipo Input'])
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
-        
-        logger.info("📊 Agrupando dados por especificação de material...")
-        production_data = df.groupby(['AnoMes', 'Especificacao de material']).agg({
-            'Massa': 'sum',
-            'DataHoraInicio': 'count'
-        }).reset_index()
-        
-        production_data.columns = ['AnoMes', 'especificacao_material', 'massa_total', 'count']
-        
-        # Converter período para string e ordenar
-        production_data['AnoMes'] = production_data['AnoMes'].astype(str)
-        production_data = production_data.sort_values(['AnoMes', 'especificacao_material'])
-        
-        # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in production_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'especificacao_material': row['especificacao_material'],
-                'massa_total': row['massa_total'],
-                'count': row['count']
-            })
-        
-        process_time = time.time() - process_start
-        logger.info(f"✅ Processamento de produção por especificação de material concluído em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} registros encontrados")
-        
-        return result
+        return self._get_production_by(filters, 'Especificacao de material', 'especificacao_material', 'especificação de material')
     
+    @_cached_by_filters
     def get_production_by_material(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém dados de produção por material"""
-        logger.info("🔄 Processando dados de produção por material...")
-        process_start = time.time()
-        
-        # Obter dados brutos
-        df = self.cycle_repository.get_raw_data()
-        
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Material', 'Massa', 'Tipo Input']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
-        # Aplicar filtros
-        df = self._apply_filters(df, filters)
-        
-        if len(df) == 0:
-            return []
-        
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Material', 'Massa', 'Tipo Input'])
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
-        
-        logger.info("📊 Agrupando dados por material...")
-        production_data = df.groupby(['AnoMes', 'Material']).agg({
-            'Massa': 'sum',
-            'DataHoraInicio': 'count'
-        }).reset_index()
-        
-        production_data.columns = ['AnoMes', 'material', 'massa_total', 'count']
-        
-        # Converter período para string e ordenar
-        production_data['AnoMes'] = production_data['AnoMes'].astype(str)
-        production_data = production_data.sort_values(['AnoMes', 'material'])
-        
-        # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in production_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'material': row['material'],
-                'massa_total': row['massa_total'],
-                'count': row['count']
-            })
-        
-        process_time = time.time() - process_start
-        logger.info(f"✅ Processamento de produção por material concluído em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} registros encontrados")
-        
-        return result
+        return self._get_production_by(filters, 'Material', 'material', 'material')
     
+    @_cached_by_filters
     def get_production_by_frota_transporte(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém dados de produção por frota de transporte"""
-        logger.info("🔄 Processando dados de produção por frota de transporte...")
-        process_start = time.time()
-        
-        # Obter dados brutos
-        df = self.cycle_repository.get_raw_data()
-        
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Frota transporte', 'Massa', 'Tipo Input']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
-        # Aplicar filtros
-        df = self._apply_filters(df, filters)
-        
-        if len(df) == 0:
-            return []
-        
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Frota transporte', 'Massa', 'Tipo Input'])
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
-        
-        logger.info("📊 Agrupando dados por frota de transporte...")
-        production_data = df.groupby(['AnoMes', 'Frota transporte']).agg({
-            'Massa': 'sum',
-            'DataHoraInicio': 'count'
-        }).reset_index()
-        
-        production_data.columns = ['AnoMes', 'frota_transporte', 'massa_total', 'count']
-        
-        # Converter período para string e ordenar
-        production_data['AnoMes'] = production_data['AnoMes'].astype(str)
-        production_data = production_data.sort_values(['AnoMes', 'frota_transporte'])
-        
-        # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in production_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'frota_transporte': row['frota_transporte'],
-                'massa_total': row['massa_total'],
-                'count': row['count']
-            })
-        
-        process_time = time.time() - process_start
-        logger.info(f"✅ Processamento de produção por frota de transporte concluído em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} registros encontrados")
-        
-        return result
+        return self._get_production_by(filters, 'Frota transporte', 'frota_transporte', 'frota de transporte')
     
+    @_cached_by_filters
     def get_production_by_frota_carga(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém dados de produção por frota de carga"""
-        logger.info("🔄 Processando dados de produção por frota de carga...")
-        process_start = time.time()
-        
-        # Obter dados brutos
-        df = self.cycle_repository.get_raw_data()
-        
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Frota carga', 'Massa', 'Tipo Input']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
-        # Aplicar filtros
-        df = self._apply_filters(df, filters)
-        
-        if len(df) == 0:
-            return []
-        
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Frota carga', 'Massa', 'Tipo Input'])
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
-        
-        logger.info("📊 Agrupando dados por frota de carga...")
-        production_data = df.groupby(['AnoMes', 'Frota carga']).agg({
-            'Massa': 'sum',
-            'DataHoraInicio': 'count'
-        }).reset_index()
-        
-        production_data.columns = ['AnoMes', 'frota_carga', 'massa_total', 'count']
-        
-        # Converter período para string e ordenar
-        production_data['AnoMes'] = production_data['AnoMes'].astype(str)
-        production_data = production_data.sort_values(['AnoMes', 'frota_carga'])
-        
-        # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in production_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'frota_carga': row['frota_carga'],
-                'massa_total': row['massa_total'],
-                'count': row['count']
-            })
-        
-        process_time = time.time() - process_start
-        logger.info(f"✅ Processamento de produção por frota de carga concluído em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} registros encontrados")
-        
-        return result
+        return self._get_production_by(filters, 'Frota carga', 'frota_carga', 'frota de carga')
     
+    @_cached_by_filters
     def get_production_by_maquinas_carga(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém dados de produção por máquinas de carga usando Tag carga como legenda"""
-        logger.info("🔄 Processando dados de produção por máquinas de carga...")
-        process_start = time.time()
-        
-        # Obter dados brutos
-        df = self.cycle_repository.get_raw_data()
-        
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Tag carga', 'Massa', 'Tipo Input']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
-        # Aplicar filtros
-        df = self._apply_filters(df, filters)
-        
-        if len(df) == 0:
-            return []
-        
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Tag carga', 'Massa', 'Tipo Input'])
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
-        
-        logger.info("📊 Agrupando dados por Tag carga...")
-        production_data = df.groupby(['AnoMes', 'Tag carga']).agg({
-            'Massa': 'sum',
-            'DataHoraInicio': 'count'
-        }).reset_index()
-        
-        production_data.columns = ['AnoMes', 'tag_carga', 'massa_total', 'count']
-        
-        # Converter período para string e ordenar
-        production_data['AnoMes'] = production_data['AnoMes'].astype(str)
-        production_data = production_data.sort_values(['AnoMes', 'tag_carga'])
-        
-        # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in production_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'tag_carga': row['tag_carga'],  # Manter consistência com JavaScript
-                'massa_total': row['massa_total'],
-                'count': row['count']
-            })
-        
-        process_time = time.time() - process_start
-        logger.info(f"✅ Processamento de produção por máquinas de carga concluído em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} registros encontrados")
-        
-        return result
+        return self._get_production_by(filters, 'Tag carga', 'tag_carga', 'máquinas de carga')
     
     def get_available_tipos_input(self) -> List[str]:
         """Obtém valores únicos da coluna 'Tipo Input' para filtros"""
-        logger.info("🔄 Obtendo valores únicos da coluna 'Tipo Input'...")
+        logger.debug("🔄 Obtendo valores únicos da coluna 'Tipo Input'...")
         try:
             result = self.cycle_repository.get_available_tipos_input()
-            logger.info(f"✅ Valores únicos obtidos: {len(result)} valores")
+            logger.debug(f"✅ Valores únicos obtidos: {len(result)} valores")
             return result
         except Exception as e:
             logger.error(f"❌ Erro ao obter valores únicos: {str(e)}")
@@ -641,10 +643,10 @@ class CycleService:
     
     def get_available_frota_transporte(self) -> List[str]:
         """Obtém valores únicos da coluna 'Frota transporte' para filtros"""
-        logger.info("🔄 Obtendo valores únicos da coluna 'Frota transporte'...")
+        logger.debug("🔄 Obtendo valores únicos da coluna 'Frota transporte'...")
         try:
             result = self.cycle_repository.get_available_frota_transporte()
-            logger.info(f"✅ Valores únicos obtidos: {len(result)} valores")
+            logger.debug(f"✅ Valores únicos obtidos: {len(result)} valores")
             return result
         except Exception as e:
             logger.error(f"❌ Erro ao obter valores únicos: {str(e)}")
@@ -652,58 +654,50 @@ class CycleService:
     
     def get_available_material_spec(self) -> List[str]:
         """Obtém a lista de especificações de material disponíveis"""
-        logger.info("🔄 Obtendo especificações de material disponíveis...")
-        process_start = time.time()
+        logger.debug("🔄 Obtendo especificações de material disponíveis...")
+        process_start = time.perf_counter()
         
         # Obter dados brutos
         df = self.cycle_repository.get_raw_data()
         
-        # Verificar se a coluna Especificacao de material existe
-        if 'Especificacao de material' not in df.columns:
-            raise ValueError('Coluna Especificacao de material não encontrada nos dados')
-        
         # Remover valores nulos
         df = df.dropna(subset=['Especificacao de material'])
         
         # Obter especificações únicas
         material_spec = df['Especificacao de material'].unique().tolist()
         
-        process_time = time.time() - process_start
-        logger.info(f"✅ Especificações de material disponíveis obtidas em {process_time:.2f}s")
-        logger.info(f"📊 {len(material_spec)} especificações de material encontradas")
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Especificações de material disponíveis obtidas em {process_time:.2f}s")
+        logger.debug(f"📊 {len(material_spec)} especificações de material encontradas")
         
         return material_spec
     
     def get_available_material(self) -> List[str]:
         """Obtém a lista de materiais disponíveis"""
-        logger.info("🔄 Obtendo materiais disponíveis...")
-        process_start = time.time()
+        logger.debug("🔄 Obtendo materiais disponíveis...")
+        process_start = time.perf_counter()
         
         # Obter dados brutos
         df = self.cycle_repository.get_raw_data()
         
-        # Verificar se a coluna Material existe
-        if 'Material' not in df.columns:
-            raise ValueError('Coluna Material não encontrada nos dados')
-        
         # Remover valores nulos
         df = df.dropna(subset=['Material'])
         
         # Obter materiais únicos
         material = df['Material'].unique().tolist()
         
-        process_time = time.time() - process_start
-        logger.info(f"✅ Materiais disponíveis obtidos em {process_time:.2f}s")
-        logger.info(f"📊 {len(material)} materiais encontrados")
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Materiais disponíveis obtidos em {process_time:.2f}s")
+        logger.debug(f"📊 {len(material)} materiais encontrados")
         
         return material
     
     def get_available_frota_carga(self) -> List[str]:
         """Obtém valores únicos da coluna 'Frota carga' para filtros"""
-        logger.info("🔄 Obtendo valores únicos da coluna 'Frota carga'...")
+        logger.debug("🔄 Obtendo valores únicos da coluna 'Frota carga'...")
         try:
             result = self.cycle_repository.get_available_frota_carga()
-            logger.info(f"✅ Valores únicos obtidos: {len(result)} valores")
+            logger.debug(f"✅ Valores únicos obtidos: {len(result)} valores")
             return result
         except Exception as e:
             logger.error(f"❌ Erro ao obter valores únicos: {str(e)}")
@@ -711,43 +705,36 @@ class CycleService:
     
     def get_available_tag_carga(self) -> List[str]:
         """Obtém valores únicos da coluna 'Tag carga' para filtros"""
-        logger.info("🔄 Obtendo valores únicos da coluna 'Tag carga'...")
+        logger.debug("🔄 Obtendo valores únicos da coluna 'Tag carga'...")
         try:
             result = self.cycle_repository.get_available_tag_carga()
-            logger.info(f"✅ Valores únicos obtidos: {len(result)} valores")
+            logger.debug(f"✅ Valores únicos obtidos: {len(result)} valores")
             return result
         except Exception as e:
             logger.error(f"❌ Erro ao obter valores únicos: {str(e)}")
             return []
     
+    @_cached_by_filters
     def get_productivity_toneladas(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém dados de produtividade em toneladas"""
-        logger.info("🔄 Processando dados de produtividade em toneladas...")
-        process_start = time.time()
+        logger.debug("🔄 Processando dados de produtividade em toneladas...")
+        process_start = time.perf_counter()
         
         # Obter dados brutos
         df = self.cycle_repository.get_raw_data()
         
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Massa', 'Tipo Input']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
         # Aplicar filtros
         df = self._apply_filters(df, filters)
         
         if len(df) == 0:
             return []
         
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Massa', 'Tipo Input'])
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
+        # Manter apenas as colunas usadas (a remoção de nulos copia só elas) e
+        # remover valores nulos
+        df = df[['AnoMes', 'DataHoraInicio', 'Massa', 'Tipo Input']].dropna(subset=['DataHoraInicio', 'Massa', 'Tipo Input'])
         
-        logger.info("📊 Calculando produtividade...")
+        # Processar dados (AnoMes já vem calculado do repository)
+        logger.debug("📊 Calculando produtividade...")
         productivity_data = df.groupby('AnoMes').agg({
             'Massa': 'sum',
             'DataHoraInicio': 'count'
@@ -768,59 +755,48 @@ class CycleService:
         # Preencher NaN com 0 para o primeiro período
         productivity_data['crescimento_toneladas_pct'] = productivity_data['crescimento_toneladas_pct'].fillna(0)
         
-        # Converter período para string e ordenar
-        productivity_data['AnoMes'] = productivity_data['AnoMes'].astype(str)
+        # Converter período para string ('YYYY-MM') e ordenar
+        productivity_data['AnoMes'] = _format_ano_mes(productivity_data['AnoMes'])
         productivity_data = productivity_data.sort_values('AnoMes')
         
         # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in productivity_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'toneladas_total': row['massa_total'] / 1000,  # Converter kg para toneladas
-                'produtividade_media_ton_h': row['produtividade_media_ton_h'],
-                'crescimento_toneladas_pct': row['crescimento_toneladas_pct'],
-                'horas_trabalhadas': row['horas_trabalhadas']
-            })
+        productivity_data['toneladas_total'] = productivity_data['massa_total'] / 1000  # Converter kg para toneladas
+        result = productivity_data.rename(columns={'AnoMes': 'ano_mes'})[
+            ['ano_mes', 'toneladas_total', 'produtividade_media_ton_h',
+             'crescimento_toneladas_pct', 'horas_trabalhadas']
+        ].to_dict(orient='records')
         
-        process_time = time.time() - process_start
-        logger.info(f"✅ Análise de produtividade em toneladas concluída em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} períodos encontrados")
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Análise de produtividade em toneladas concluída em {process_time:.2f}s")
+        logger.debug(f"📊 {len(result)} períodos encontrados")
         
         return result
     
+    @_cached_by_filters
     def get_productivity_by_equipment_carga_stacked(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém produtividade por equipamento de carga em colunas empilhadas"""
-        logger.info("🔄 Processando produtividade por equipamento de carga empilhada...")
-        process_start = time.time()
+        logger.debug("🔄 Processando produtividade por equipamento de carga empilhada...")
+        process_start = time.perf_counter()
         
         # Obter dados brutos
         df = self.cycle_repository.get_raw_data()
         
-        # Verificar se as colunas necessárias existem
-        required_columns = ['DataHoraInicio', 'Massa', 'Tag carga']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
         # Aplicar filtros
         df = self._apply_filters(df, filters)
         
         if len(df) == 0:
             return []
         
-        # Remover valores nulos
-        df = df.dropna(subset=['DataHoraInicio', 'Massa', 'Tag carga'])
+        # Manter apenas as colunas usadas (a remoção de nulos copia só elas) e
+        # remover valores nulos
+        df = df[['AnoMes', 'DataHoraInicio', 'Massa', 'Tag carga']].dropna(subset=['DataHoraInicio', 'Massa', 'Tag carga'])
         
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
-        
-        logger.info("📊 Calculando produtividade por equipamento...")
-        equipment_data = df.groupby(['AnoMes', 'Tag carga']).agg({
-            'Massa': 'sum',
-            'DataHoraInicio': 'count'
-        }).reset_index()
+        # Processar dados (AnoMes já vem calculado do repository)
+        logger.debug("📊 Calculando produtividade por equipamento...")
+        equipment_data = df.groupby(['AnoMes', 'Tag carga'], observed=True, sort=False).agg(
+            massa_total=('Massa', 'sum'),
+            count=('Massa', 'size')
+        ).reset_index()
         
         equipment_data.columns = ['AnoMes', 'equipamento', 'massa_total', 'count']
         
@@ -832,27 +808,61 @@ class CycleService:
             equipment_data['massa_total'] / 1000 / equipment_data['horas_trabalhadas']
         )
         
-        # Converter período para string e ordenar
-        equipment_data['AnoMes'] = equipment_data['AnoMes'].astype(str)
+        # Converter período para string ('YYYY-MM') e ordenar
+        equipment_data['AnoMes'] = _format_ano_mes(equipment_data['AnoMes'])
         equipment_data = equipment_data.sort_values(['AnoMes', 'equipamento'])
         
         # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in equipment_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'equipamento': row['equipamento'],
-                'toneladas_total': row['massa_total'] / 1000,  # Converter kg para toneladas
-                'produtividade_media_ton_h': row['produtividade_media_ton_h'],
-                'horas_trabalhadas': row['horas_trabalhadas']
-            })
+        equipment_data['toneladas_total'] = equipment_data['massa_total'] / 1000  # Converter kg para toneladas
+        result = equipment_data.rename(columns={'AnoMes': 'ano_mes'})[
+            ['ano_mes', 'equipamento', 'toneladas_total', 'produtividade_media_ton_h', 'horas_trabalhadas']
+        ].to_dict(orient='records')
         
-        process_time = time.time() - process_start
-        logger.info(f"✅ Produtividade por equipamento de carga empilhada concluída em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} registros encontrados")
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Produtividade por equipamento de carga empilhada concluída em {process_time:.2f}s")
+        logger.debug(f"📊 {len(result)} registros encontrados")
         
         return result
     
+    def warm_up(self) -> None:
+        """Pré-carrega os dados e pré-calcula a carga inicial do painel (executado em segundo plano).
+
+        O painel abre sem filtros e consulta as listas de filtros e todos os gráficos
+        de uma vez: com os resultados já no cache, a primeira visita não espera o
+        processamento de cada gráfico.
+        """
+        self.cycle_repository.warm_up()
+        
+        try:
+            start_time = time.perf_counter()
+            
+            self.get_available_tipos_input()
+            self.get_available_frota_transporte()
+            self.get_available_frota_carga()
+            self.get_available_tag_carga()
+            
+            filters = DateRangeDTO()
+            for endpoint in (
+                self.get_cycles_by_year_month,
+                self.get_cycles_by_type_input,
+                self.get_production_by_activity_type,
+                self.get_productivity_analysis,
+                self.get_productivity_by_equipment,
+                self.get_production_by_material_spec,
+                self.get_production_by_material,
+                self.get_production_by_frota_transporte,
+                self.get_production_by_frota_carga,
+                self.get_production_by_maquinas_carga,
+                self.get_productivity_toneladas,
+                self.get_productivity_by_equipment_carga_stacked,
+                self.get_cycle_time_stacked
+            ):
+                endpoint(filters)
+            
+            logger.info(f"🔥 Gráficos sem filtros pré-calculados em {time.perf_counter() - start_time:.2f}s")
+        except Exception as e:
+            logger.error(f"❌ Erro ao pré-calcular gráficos: {e}")
+    
     def clear_cache(self) -> Dict[str, Any]:
         """Limpa o cache"""
         return self.cycle_repository.clear_cache()
@@ -861,79 +871,27 @@ class CycleService:
         """Obtém status do cache"""
         return self.cycle_repository.get_cache_status()
     
-    def _convert_time_to_minutes(self, time_str):
-        """Converte tempo no formato HH:MM:SS para minutos (float)"""
-        try:
-            if pd.isna(time_str) or time_str == '' or time_str == '00:00:00':
-                return 0.0
-            
-            # Se já é numérico, retornar como está
-            if isinstance(time_str, (int, float)):
-                return float(time_str)
-            
-            # Converter string para minutos
-            time_str = str(time_str).strip()
-            
-            # Tratar diferentes formatos de tempo
-            if ':' in time_str:
-                # Formato HH:MM:SS ou MM:SS
-                parts = time_str.split(':')
-                if len(parts) == 3:  # HH:MM:SS
-                    hours, minutes, seconds = map(float, parts)
-                    return hours * 60 + minutes + seconds / 60
-                elif len(parts) == 2:  # MM:SS
-                    minutes, seconds = map(float, parts)
-                    return minutes + seconds / 60
-            else:
-                # Tentar converter diretamente para float
-                return float(time_str)
-                
-        except (ValueError, TypeError, AttributeError) as e:
-            logger.warning(f"⚠️ Erro ao converter tempo '{time_str}': {e}. Usando 0.")
-            return 0.0
-    
+    @_cached_by_filters
     def get_cycle_time_stacked(self, filters: DateRangeDTO) -> List[Dict[str, Any]]:
         """Obtém dados de tempo de ciclo empilhado pela média mensal"""
-        logger.info("🔄 Processando dados de tempo de ciclo empilhado...")
-        process_start = time.time()
+        logger.debug("🔄 Processando dados de tempo de ciclo empilhado...")
+        process_start = time.perf_counter()
         
         # Obter dados brutos
         df = self.cycle_repository.get_raw_data()
         
-        # Verificar se as colunas necessárias existem
-        required_columns = [
-            'DataHoraInicio', 'Operando vazio', 'Fila carga', 'Manobra carga', 'Carga',
-            'Operando cheio', 'Fila Descarga', 'Manobra descarga', 'Descarga'
-        ]
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f'Coluna {col} não encontrada nos dados')
-        
         # Aplicar filtros
         df = self._apply_filters(df, filters)
         
         if len(df) == 0:
             return []
         
-        # Remover valores nulos nas colunas de tempo
-        time_columns = [
-            'Operando vazio', 'Fila carga', 'Manobra carga', 'Carga',
-            'Operando cheio', 'Fila Descarga', 'Manobra descarga', 'Descarga'
-        ]
-        df = df.dropna(subset=['DataHoraInicio'] + time_columns)
-        
-        # Converter colunas de tempo de string para minutos (numérico)
-        logger.info("🔄 Convertendo tempos de string para minutos...")
-        for col in time_columns:
-            if col in df.columns:
-                # Converter tempo no formato HH:MM:SS para minutos
-                df[col] = df[col].apply(self._convert_time_to_minutes)
-        
-        # Processar dados
-        logger.info("📅 Criando períodos...")
-        df['AnoMes'] = df['DataHoraInicio'].dt.to_period('M')
+        # Manter apenas as colunas usadas (a remoção de nulos copia só elas) e remover
+        # valores nulos nas colunas de tempo (já convertidas para minutos na carga)
+        df = df[['AnoMes', 'DataHoraInicio'] + TIME_COLUMNS].dropna(subset=['DataHoraInicio'] + TIME_COLUMNS)
         
-        logger.info("📊 Calculando tempos médios de ciclo por mês...")
+        # Processar dados (AnoMes já vem calculado do repository)
+        logger.debug("📊 Calculando tempos médios de ciclo por mês...")
         
         # Calcular médias mensais para cada fase do ciclo
         cycle_time_data = df.groupby('AnoMes').agg({
@@ -959,29 +917,28 @@ class CycleService:
             cycle_time_data['Descarga']
         )
         
-        # Converter período para string e ordenar
-        cycle_time_data['AnoMes'] = cycle_time_data['AnoMes'].astype(str)
+        # Converter período para string ('YYYY-MM') e ordenar
+        cycle_time_data['AnoMes'] = _format_ano_mes(cycle_time_data['AnoMes'])
         cycle_time_data = cycle_time_data.sort_values('AnoMes')
         
         # Mapear campos para o formato esperado pelo DTO
-        result = []
-        for _, row in cycle_time_data.iterrows():
-            result.append({
-                'ano_mes': row['AnoMes'],
-                'operando_vazio': round(row['Operando vazio'], 2),
-                'fila_carga': round(row['Fila carga'], 2),
-                'manobra_carga': round(row['Manobra carga'], 2),
-                'carga': round(row['Carga'], 2),
-                'operando_cheio': round(row['Operando cheio'], 2),
-                'fila_descarga': round(row['Fila Descarga'], 2),
-                'manobra_descarga': round(row['Manobra descarga'], 2),
-                'descarga': round(row['Descarga'], 2),
-                'total_ciclo': round(row['total_ciclo'], 2)
-            })
-        
-        process_time = time.time() - process_start
-        logger.info(f"✅ Processamento de tempo de ciclo empilhado concluído em {process_time:.2f}s")
-        logger.info(f"📊 {len(result)} períodos encontrados")
+        colunas_dto = {
+            'AnoMes': 'ano_mes',
+            'Operando vazio': 'operando_vazio',
+            'Fila carga': 'fila_carga',
+            'Manobra carga': 'manobra_carga',
+            'Carga': 'carga',
+            'Operando cheio': 'operando_cheio',
+            'Fila Descarga': 'fila_descarga',
+            'Manobra descarga': 'manobra_descarga',
+            'Descarga': 'descarga',
+            'total_ciclo': 'total_ciclo'
+        }
+        result = cycle_time_data[list(colunas_dto)].rename(columns=colunas_dto).round(2).to_dict(orient='records')
+        
+        process_time = time.perf_counter() - process_start
+        logger.debug(f"✅ Processamento de tempo de ciclo empilhado concluído em {process_time:.2f}s")
+        logger.debug(f"📊 {len(result)} períodos encontrados")
         
         return result
     
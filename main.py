@@ -1,4 +1,5 @@
 import logging
+import os
 
 import uvicorn
 from fastapi import FastAPI, HTTPException
@@ -6,7 +7,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
-from app.modules.cycle_module import configure_cycle_module, get_cycle_router
+from app.middleware.gzip_middleware import NegotiatedGZipMiddleware
+from app.modules.cycle_module import configure_cycle_module, get_cycle_router, warm_up_cycle_cache
 
 # Configurar logging
 logging.basicConfig(
@@ -33,6 +35,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Comprimir respostas (JSON dos gráficos, com chaves repetidas em cada registro).
+# Respostas que já definem Content-Encoding (os gráficos, que enviam o gzip
+# pré-calculado) são repassadas sem nova compressão
+app.add_middleware(NegotiatedGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Configurar arquivos estáticos
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -43,6 +50,13 @@ configure_cycle_module()
 app.include_router(get_cycle_router())
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Pré-carrega o cache de dados ao iniciar a aplicação"""
+    logger.info("🔥 Iniciando pré-carregamento do cache em segundo plano...")
+    warm_up_cycle_cache()
+
+
 @app.get("/")
 async def root():
     """Endpoint raiz que serve a interface web"""
@@ -96,11 +110,20 @@ async def global_exception_handler(request, exc):
 
 
 if __name__ == "__main__":
+    # Recarga automática (observador de arquivos) apenas em desenvolvimento
+    # (APP_ENV=development); fora dele o servidor roda sem o reloader e com
+    # WEB_CONCURRENCY processos (cada processo mantém o próprio cache de dados)
+    desenvolvimento = os.getenv("APP_ENV", "").lower() == "development"
+    workers = 1 if desenvolvimento else int(os.getenv("WEB_CONCURRENCY", "1"))
+    
     logger.info("🚀 Iniciando aplicação FastAPI...")
     logger.info("🌐 Servidor será executado em: http://127.0.0.1:8000")
     logger.info("📊 Documentação da API: http://127.0.0.1:8000/docs")
     logger.info("🏠 Interface web: http://127.0.0.1:8000")
-    logger.info("🔧 Modo debug: Ativado")
+    if desenvolvimento:
+        logger.info("🔧 Modo desenvolvimento: recarga automática ativada")
+    else:
+        logger.info(f"🔧 Modo produção: {workers} worker(s), sem recarga automática")
     logger.info("⚡ Para parar o servidor: Ctrl+C")
     logger.info("=" * 60)
     
@@ -109,7 +132,8 @@ if __name__ == "__main__":
             "main:app",
             host="0.0.0.0",
             port=8000,
-            reload=True,
+            reload=desenvolvimento,
+            workers=workers,
             log_level="info"
         )
     except KeyboardInterrupt:
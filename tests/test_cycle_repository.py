@@ -0,0 +1,232 @@
+import datetime
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from app.repositories.cycle_repository import (CATEGORY_COLUMNS, STRIPPED_CATEGORY_COLUMNS,
+                                               CycleRepository, _convert_time_to_minutes)
+
+
+def test_tempos_no_formato_hh_mm_ss_pelo_regex():
+    """Tempos HH:MM:SS (com frações de segundo, como nos arquivos) são convertidos em minutos"""
+    tempos = pd.Series(['00:06:05.0000000', '01:02:30', '00:00:00.0000000', '12:5:7.5'], dtype=pd.ArrowDtype(pa.string()))
+    
+    minutos = CycleRepository._convert_times_to_minutes(tempos)
+    
+    assert minutos.tolist() == pytest.approx([6 + 5 / 60, 62.5, 0.0, 725.125])
+
+
+def test_tempos_fora_do_formato_seguem_a_conversao_item_a_item():
+    """Valores que o regex não reconhece têm o mesmo resultado de _convert_time_to_minutes"""
+    tempos = pd.Series(['05:30', ' 01:00:00', '7.5', '', 'abc', datetime.time(1, 2, 30), '00:10:00'], dtype=object)
+    
+    minutos = CycleRepository._convert_times_to_minutes(tempos)
+    
+    assert minutos.tolist() == pytest.approx(tempos.map(_convert_time_to_minutes).tolist())
+    assert minutos.tolist() == pytest.approx([5.5, 60.0, 7.5, 0.0, 0.0, 62.5, 10.0])
+
+
+@pytest.mark.parametrize('tempos', [
+    pd.Series(['00:01:00', None, np.nan], dtype=object),
+    pd.Series(['00:01:00', None, np.nan, datetime.time(0, 2)], dtype=object)
+], ids=['texto', 'tipos-misturados'])
+def test_tempos_nulos_continuam_nulos(tempos: pd.Series):
+    """Ao contrário da conversão item a item (que usa 0), nulos continuam nulos"""
+    minutos = CycleRepository._convert_times_to_minutes(tempos)
+    
+    assert minutos.iloc[0] == 1.0
+    assert minutos.iloc[1:3].isna().all()
+    assert minutos.iloc[3:].tolist() == [2.0] * len(minutos.iloc[3:])
+
+
+def test_tempos_numericos_apenas_convertidos_para_float():
+    tempos = pd.Series([1, 2, 30])
+    
+    minutos = CycleRepository._convert_times_to_minutes(tempos)
+    
+    assert minutos.dtype == 'float64'
+    assert minutos.tolist() == [1.0, 2.0, 30.0]
+
+
+@pytest.mark.parametrize('valores, tipo', [
+    ([0.0, 200.0, 255.0], 'uint8'),
+    ([0.0, 70000.0], 'uint32'),
+    ([1.0, 300.0], 'uint16')
+])
+def test_massa_inteira_vira_o_menor_tipo_inteiro(valores: list, tipo: str):
+    massa = CycleRepository._downcast_massa(pd.Series(valores))
+    
+    assert massa.dtype == pd.ArrowDtype(getattr(pa, tipo)())
+    assert massa.tolist() == [int(valor) for valor in valores]
+
+
+def test_massa_negativa_usa_tipo_com_sinal():
+    massa = CycleRepository._downcast_massa(pd.Series([-5.0, 300.0]))
+    
+    assert pa.types.is_signed_integer(massa.dtype.pyarrow_dtype)
+    assert massa.tolist() == [-5, 300]
+
+
+@pytest.mark.parametrize('valores', [
+    pd.Series([10.0, np.nan, 20.0]),
+    pd.Series([10.0, None, 20.0], dtype=pd.ArrowDtype(pa.float64()))
+], ids=['numpy', 'arrow'])
+def test_massa_com_nulos_mantem_os_nulos(valores: pd.Series):
+    massa = CycleRepository._downcast_massa(valores)
+    
+    assert massa.dtype == pd.ArrowDtype(pa.uint8())
+    assert massa.isna().tolist() == [False, True, False]
+    assert massa.sum() == 30
+
+
+@pytest.mark.parametrize('valores', [
+    pd.Series([1.5, 2.0]),
+    pd.Series([np.nan, np.nan]),
+    pd.Series(['10', '20'])
+], ids=['fracionaria', 'apenas-nulos', 'texto'])
+def test_massa_nao_inteira_mantida_como_esta(valores: pd.Series):
+    """Valores fracionários, só nulos ou não numéricos não são convertidos"""
+    assert CycleRepository._downcast_massa(valores) is valores
+
+
+def test_soma_da_massa_convertida_continua_exata():
+    """A soma de uma coluna uint8 acumula em 64 bits, sem estourar o tipo da coluna"""
+    valores = pd.Series(np.full(10_000, 250.0))
+    
+    massa = CycleRepository._downcast_massa(valores)
+    
+    assert massa.dtype == pd.ArrowDtype(pa.uint8())
+    assert massa.sum() == 2_500_000
+    assert massa.groupby(np.arange(10_000) % 2).sum().tolist() == [1_250_000, 1_250_000]
+
+
+def _tags(valores: list) -> pd.Series:
+    """Coluna category com rótulos em string Arrow, como na carga dos arquivos"""
+    return pd.Series(valores, dtype=pd.ArrowDtype(pa.string()), index=range(10, 10 + len(valores)),
+                     name='Tag carga').astype('category')
+
+
+def test_strip_unifica_rotulos_e_mantem_nulos():
+    """Rótulos iguais após o strip viram uma só categoria; códigos nulos continuam nulos"""
+    tags = _tags(['ESC-01 ', None, 'ESC-01', 'CAR-01', ' CAR-01 ', None])
+    
+    resultado = CycleRepository._strip_categories(tags)
+    
+    assert resultado.cat.categories.tolist() == ['CAR-01', 'ESC-01']
+    assert resultado.cat.categories.dtype == tags.cat.categories.dtype
+    assert resultado.tolist()[0::2] == ['ESC-01', 'ESC-01', 'CAR-01']
+    assert resultado.isna().tolist() == [False, True, False, False, False, True]
+    assert resultado.index.equals(tags.index)
+    assert resultado.name == 'Tag carga'
+    assert resultado.value_counts().to_dict() == {'CAR-01': 2, 'ESC-01': 2}
+
+
+@pytest.mark.parametrize('valores', [
+    _tags(['ESC-01', None, 'CAR-01']),
+    pd.Series([1, 2, 1]).astype('category')
+], ids=['sem-espacos', 'nao-texto'])
+def test_strip_sem_alteracao_retorna_a_mesma_coluna(valores: pd.Series):
+    assert CycleRepository._strip_categories(valores) is valores
+
+
+def test_strip_nao_altera_rotulos_de_material():
+    """Rótulos de Material (ex.: 'CARB HG ') aparecem nos gráficos como estão nos arquivos"""
+    assert 'Material' in CATEGORY_COLUMNS
+    assert 'Material' not in STRIPPED_CATEGORY_COLUMNS
+    assert set(STRIPPED_CATEGORY_COLUMNS) <= set(CATEGORY_COLUMNS)
+
+
+class _CalculoLento:
+    """Cálculo que demora e registra quantas execuções ocorreram ao mesmo tempo"""
+    
+    def __init__(self, duracao: float = 0.1):
+        self.duracao = duracao
+        self.chamadas = 0
+        self.ativos = 0
+        self.max_ativos = 0
+        self._lock = threading.Lock()
+    
+    def __call__(self) -> str:
+        with self._lock:
+            self.chamadas += 1
+            self.ativos += 1
+            self.max_ativos = max(self.max_ativos, self.ativos)
+        time.sleep(self.duracao)
+        with self._lock:
+            self.ativos -= 1
+        return 'resultado'
+
+
+@pytest.fixture
+def repositorio(tmp_path, monkeypatch: pytest.MonkeyPatch) -> CycleRepository:
+    """Repository sem arquivos: hash fixo e dados "carregados" sem ler o disco"""
+    repositorio = CycleRepository(data_path=str(tmp_path))
+    
+    def get_raw_data():
+        repositorio._cache['files_hash'] = 'hash'
+        return pd.DataFrame()
+    
+    monkeypatch.setattr(repositorio, '_get_files_hash', lambda: 'hash')
+    monkeypatch.setattr(repositorio, 'get_raw_data', get_raw_data)
+    return repositorio
+
+
+def test_calculo_unico_por_chave_mesmo_quando_o_resultado_nao_e_guardado(repositorio: CycleRepository,
+                                                                          monkeypatch: pytest.MonkeyPatch):
+    """Quem chega enquanto outras requisições aguardam usa o mesmo lock e não calcula em paralelo"""
+    set_processed_data = repositorio.set_processed_data
+    guardados = []
+    
+    def descartar_o_primeiro(key, value):
+        # O primeiro resultado não é guardado (como após uma recarga ou remoção pelo LRU)
+        guardados.append(key)
+        if len(guardados) > 1:
+            set_processed_data(key, value)
+    
+    monkeypatch.setattr(repositorio, 'set_processed_data', descartar_o_primeiro)
+    calculo = _CalculoLento()
+    resultados = []
+    
+    def requisicao():
+        resultados.append(repositorio.get_or_compute_processed_data('chave', calculo))
+    
+    # A calcula; B e C aguardam; D chega quando B já recalcula (o resultado de A foi descartado)
+    threads = []
+    for atraso in (0.0, 0.02, 0.02, 0.15):
+        time.sleep(atraso)
+        thread = threading.Thread(target=requisicao)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    
+    assert resultados == ['resultado'] * 4
+    assert calculo.max_ativos == 1
+    assert calculo.chamadas == 2
+    assert repositorio._processed_locks == {}
+
+
+def test_cache_em_disco_nao_usa_nem_remove_temporarios_de_outros_workers(tmp_path):
+    """Cada gravação usa um temporário próprio e a limpeza preserva os .tmp em andamento"""
+    repositorio = CycleRepository(data_path=str(tmp_path))
+    os.makedirs(repositorio.cache_dir)
+    cache_path = os.path.join(repositorio.cache_dir, 'arquivo.arrow')
+    antigo_path = os.path.join(repositorio.cache_dir, 'antigo.arrow')
+    # Gravação em andamento de outro worker no caminho temporário "fixo" do mesmo arquivo
+    outro_tmp_path = f"{cache_path}.tmp"
+    for path in (antigo_path, outro_tmp_path):
+        with open(path, 'wb') as f:
+            f.write(b'parcial')
+    
+    repositorio._save_disk_cache(pd.DataFrame({'Massa': [1.5, 2.5]}), cache_path)
+    repositorio._remove_disk_cache(keep={cache_path})
+    
+    assert repositorio._load_disk_cache(cache_path)['Massa'].tolist() == [1.5, 2.5]
+    assert sorted(os.listdir(repositorio.cache_dir)) == ['arquivo.arrow', 'arquivo.arrow.tmp']
+    with open(outro_tmp_path, 'rb') as f:
+        assert f.read() == b'parcial'
@@ -0,0 +1,258 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.dto.cycle_dto import DateRangeDTO
+from app.repositories.cycle_repository import CycleRepository
+from app.services import cycle_service
+from app.services.cycle_service import CycleService, _sum_by_key_and_code
+
+# Dia com ciclos iniciados exatamente à 00:00 nos dados de teste
+DIA_COM_MEIA_NOITE = '2024-03-01'
+
+
+class _RepositorioEmMemoria:
+    """Repository de teste: dados fixos e cache de resultados em um dicionário"""
+    
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.cache = {}
+    
+    def get_raw_data(self) -> pd.DataFrame:
+        return self.df
+    
+    def get_or_compute_processed_data(self, key, compute):
+        if key not in self.cache:
+            self.cache[key] = compute()
+        return self.cache[key]
+
+
+def _categorias(rng: np.random.Generator, valores: list, n: int) -> pd.Categorical:
+    """Sorteia valores de uma coluna category (None vira nulo)"""
+    return pd.Categorical(rng.choice(np.array(valores, dtype=object), n))
+
+
+def _dados_brutos(n: int = 3000) -> pd.DataFrame:
+    """Monta dados no formato entregue pelo repository: ordenados por data, com AnoMes e colunas category.
+
+    Os horários caem em horas inteiras, então vários ciclos começam exatamente à
+    meia-noite, o caso de borda do filtro de data_fim no cubo de produção.
+    """
+    rng = np.random.default_rng(42)
+    primeira_hora = np.datetime64('2024-01-20T00:00', 'ns')
+    
+    # Alguns ciclos garantidamente à 00:00 de DIA_COM_MEIA_NOITE
+    hora_meia_noite = (np.datetime64(DIA_COM_MEIA_NOITE, 'h') - primeira_hora.astype('datetime64[h]')).astype(np.int64)
+    horas = np.sort(np.concatenate([rng.integers(0, 24 * 70, n - 5), np.full(5, hora_meia_noite)]))
+    datas = pd.Series(primeira_hora + horas.astype('timedelta64[h]'))
+    
+    massa = rng.integers(50, 250, n).astype('float64')
+    massa[rng.random(n) < 0.05] = np.nan
+    
+    df = pd.DataFrame({
+        'DataHoraInicio': datas,
+        'Massa': massa,
+        'Tipo Input': _categorias(rng, ['EMBARCADO', 'DESEMBARCADO', None], n),
+        'Frota transporte': _categorias(rng, ['CAT 777F', 'CAT 785C'], n),
+        'Frota carga': _categorias(rng, ['PC 2000', 'CAT 992K', None], n),
+        'Tag carga': _categorias(rng, ['ESC-01', 'ESC-02', 'CAR-01', None], n),
+        'Tipo de atividade': _categorias(rng, ['Minério', 'Estéril'], n),
+        'Especificacao de material': _categorias(rng, ['ROM', 'Estéril', None], n),
+        'Material': _categorias(rng, ['CARB HG', 'CARB MG', 'FOSF', '-'], n)
+    })
+    df['AnoMes'] = (datas.dt.year * 12 + datas.dt.month - 1).astype('int32')
+    return df
+
+
+@pytest.fixture(scope='module')
+def dados() -> pd.DataFrame:
+    df = _dados_brutos()
+    assert (df['DataHoraInicio'] == pd.Timestamp(DIA_COM_MEIA_NOITE)).any()
+    return df
+
+
+def _normalizar(totais: pd.DataFrame, coluna: str) -> pd.DataFrame:
+    """Ordena os totais por (AnoMes, coluna) com tipos comparáveis"""
+    totais = totais.reset_index()
+    totais[coluna] = totais[coluna].astype(str)
+    totais = totais.astype({'AnoMes': 'int64', 'massa_total': 'float64', 'count': 'int64'})
+    return totais.sort_values(['AnoMes', coluna]).reset_index(drop=True)
+
+
+def _totais_de_referencia(service: CycleService, df: pd.DataFrame, filters: DateRangeDTO,
+                          coluna: str) -> pd.DataFrame:
+    """Totais por (AnoMes, coluna) calculados direto dos dados brutos filtrados"""
+    linhas = service._apply_filters(df, filters).dropna(subset=['Massa', 'Tipo Input', coluna])
+    totais = linhas.groupby(['AnoMes', coluna], observed=True).agg(
+        massa_total=('Massa', 'sum'),
+        count=('Massa', 'size')
+    )
+    return _normalizar(totais, coluna)
+
+
+def _totais_do_cubo(service: CycleService, df: pd.DataFrame, filters: DateRangeDTO,
+                    coluna: str) -> pd.DataFrame:
+    """Totais por (AnoMes, coluna) calculados sobre as linhas filtradas do cubo de produção"""
+    cubo = service._get_filtered_production_cube(filters).dropna(subset=[coluna])
+    totais = cubo.groupby(['AnoMes', coluna], observed=True).agg(
+        massa_total=('massa_total', 'sum'),
+        count=('count', 'sum')
+    )
+    return _normalizar(totais, coluna)
+
+
+@pytest.mark.parametrize('filters', [
+    DateRangeDTO(data_inicio=DIA_COM_MEIA_NOITE, data_fim=DIA_COM_MEIA_NOITE),
+    DateRangeDTO(data_fim=DIA_COM_MEIA_NOITE),
+    DateRangeDTO(data_inicio='2024-03-10', data_fim=DIA_COM_MEIA_NOITE),
+    DateRangeDTO(data_inicio='2024-02-01', data_fim=DIA_COM_MEIA_NOITE, tipos_input=['EMBARCADO']),
+    DateRangeDTO(data_inicio='2024-02-15', tag_carga=['ESC-01', 'CAR-01'])
+], ids=['inicio-igual-fim', 'apenas-fim', 'inicio-apos-fim', 'periodo-e-tipo', 'inicio-e-tag'])
+@pytest.mark.parametrize('coluna', ['Tipo Input', 'Material', 'Tag carga'])
+def test_cubo_filtrado_equivale_aos_dados_brutos(dados: pd.DataFrame, filters: DateRangeDTO, coluna: str):
+    """O cubo diário (mais os ciclos da 00:00 de data_fim) soma o mesmo que filtrar os dados brutos"""
+    service = CycleService(_RepositorioEmMemoria(dados))
+    
+    esperado = _totais_de_referencia(service, dados, filters, coluna)
+    obtido = _totais_do_cubo(service, dados, filters, coluna)
+    
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+
+def test_cubo_inclui_ciclos_da_meia_noite_de_data_fim(dados: pd.DataFrame):
+    """Com data_inicio == data_fim restam apenas os ciclos iniciados à 00:00 desse dia"""
+    service = CycleService(_RepositorioEmMemoria(dados))
+    filters = DateRangeDTO(data_inicio=DIA_COM_MEIA_NOITE, data_fim=DIA_COM_MEIA_NOITE)
+    
+    meia_noite = dados[dados['DataHoraInicio'] == pd.Timestamp(DIA_COM_MEIA_NOITE)].dropna(subset=['Massa', 'Tipo Input'])
+    cubo = service._get_filtered_production_cube(filters)
+    
+    assert len(meia_noite) > 0
+    assert cubo['count'].sum() == len(meia_noite)
+    assert cubo['massa_total'].sum() == meia_noite['Massa'].sum()
+
+
+def test_cubo_vazio_com_data_inicio_apos_data_fim(dados: pd.DataFrame):
+    """Período invertido não seleciona nenhum dia, nem os ciclos da meia-noite de data_fim"""
+    service = CycleService(_RepositorioEmMemoria(dados))
+    filters = DateRangeDTO(data_inicio='2024-03-10', data_fim=DIA_COM_MEIA_NOITE)
+    
+    assert len(service._get_filtered_production_cube(filters)) == 0
+
+
+def _soma_de_referencia(chaves: np.ndarray, categorias: pd.Series, massa: np.ndarray,
+                        contagens: np.ndarray = None) -> pd.DataFrame:
+    """Mesma soma de _sum_by_key_and_code feita com groupby (que descarta categorias nulas)"""
+    df = pd.DataFrame({
+        'chave': chaves,
+        'categoria': categorias.to_numpy(),
+        'massa_total': massa,
+        'count': np.ones(len(chaves), dtype=np.int64) if contagens is None else contagens
+    })
+    return df.groupby(['chave', 'categoria'], observed=True).agg(
+        massa_total=('massa_total', 'sum'),
+        count=('count', 'sum')
+    ).reset_index()
+
+
+def _comparar_somas(obtido: pd.DataFrame, esperado: pd.DataFrame) -> None:
+    for df in (obtido, esperado):
+        df['categoria'] = df['categoria'].astype(str)
+    obtido = obtido.astype({'chave': 'int64', 'count': 'int64'}).sort_values(['chave', 'categoria']).reset_index(drop=True)
+    esperado = esperado.astype({'chave': 'int64', 'count': 'int64'}).sort_values(['chave', 'categoria']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+
+
+@pytest.mark.parametrize('tipo_massa', ['int64', 'float64'])
+def test_soma_densa_equivale_ao_groupby(tipo_massa: str):
+    """Soma e contagem por (chave, categoria) iguais às do groupby, com nulos e categorias sem linhas"""
+    rng = np.random.default_rng(7)
+    n = 2000
+    chaves = rng.integers(24290, 24310, n)
+    categorias = pd.Series(pd.Categorical(
+        rng.choice(np.array(['A', 'B', 'C', None], dtype=object), n),
+        categories=['A', 'B', 'C', 'sem linhas']
+    ))
+    massa = rng.integers(0, 300, n).astype(tipo_massa)
+    
+    obtido = _sum_by_key_and_code(chaves, categorias, massa)
+    
+    assert categorias.isna().any()
+    assert obtido['massa_total'].dtype == ('int64' if tipo_massa == 'int64' else 'float64')
+    _comparar_somas(obtido, _soma_de_referencia(chaves, categorias, massa))
+
+
+def test_soma_densa_com_contagens_de_linhas_agregadas():
+    """Com contagens (linhas do cubo) cada linha soma a sua contagem em vez de 1"""
+    rng = np.random.default_rng(11)
+    n = 500
+    chaves = rng.integers(0, 10, n)
+    categorias = pd.Series(pd.Categorical(rng.choice(np.array(['X', 'Y', None], dtype=object), n)))
+    massa = rng.integers(0, 1000, n)
+    contagens = rng.integers(1, 20, n)
+    
+    obtido = _sum_by_key_and_code(chaves, categorias, massa, contagens)
+    
+    _comparar_somas(obtido, _soma_de_referencia(chaves, categorias, massa, contagens))
+
+
+def test_soma_densa_ignora_categorias_nulas():
+    """Um código nulo (-1) não é somado na célula de outra categoria nem gera índice negativo"""
+    categorias = pd.Series(pd.Categorical([None, 'a', 'b', None, 'a'], categories=['a', 'b']))
+    chaves = np.array([5, 5, 6, 6, 6])
+    massa = np.array([100, 1, 2, 100, 3])
+    
+    obtido = _sum_by_key_and_code(chaves, categorias, massa)
+    
+    assert obtido['chave'].tolist() == [5, 6, 6]
+    assert obtido['categoria'].astype(str).tolist() == ['a', 'a', 'b']
+    assert obtido['massa_total'].tolist() == [1, 3, 2]
+    assert obtido['count'].tolist() == [1, 1, 1]
+
+
+def test_soma_densa_retorna_none_para_o_groupby(monkeypatch: pytest.MonkeyPatch):
+    """Sem coluna category, sem categorias válidas ou com a grade grande demais, o caller usa o groupby"""
+    chaves = np.array([0, 1000])
+    massa = np.array([1, 2])
+    
+    assert _sum_by_key_and_code(chaves, pd.Series(['a', 'b']), massa) is None
+    assert _sum_by_key_and_code(chaves, pd.Series(pd.Categorical([None, None], categories=['a'])), massa) is None
+    
+    categorias = pd.Series(pd.Categorical(['a', 'b']))
+    assert _sum_by_key_and_code(chaves, categorias, massa) is not None
+    monkeypatch.setattr(cycle_service, 'DENSE_GROUPBY_MAX_CELLS', 1001 * 2 - 1)
+    assert _sum_by_key_and_code(chaves, categorias, massa) is None
+
+
+@pytest.mark.parametrize('endpoint', [
+    'get_production_by_material', 'get_production_by_activity_type', 'get_productivity_by_equipment'
+])
+def test_resultado_igual_com_soma_densa_e_com_groupby(dados: pd.DataFrame, monkeypatch: pytest.MonkeyPatch,
+                                                      endpoint: str):
+    """Os endpoints retornam o mesmo resultado pela soma densa e pelo groupby de fallback"""
+    filters = DateRangeDTO(data_inicio='2024-02-01', data_fim=DIA_COM_MEIA_NOITE)
+    
+    denso = getattr(CycleService(_RepositorioEmMemoria(dados)), endpoint)(filters)
+    monkeypatch.setattr(cycle_service, 'DENSE_GROUPBY_MAX_CELLS', 0)
+    fallback = getattr(CycleService(_RepositorioEmMemoria(dados)), endpoint)(filters)
+    
+    assert len(denso) > 0
+    assert denso == fallback
+
+
+@pytest.mark.parametrize('max_celulas', [cycle_service.DENSE_GROUPBY_MAX_CELLS, 0], ids=['densa', 'groupby'])
+@pytest.mark.parametrize('endpoint', [
+    'get_production_by_activity_type', 'get_production_by_material_spec', 'get_production_by_material',
+    'get_production_by_frota_transporte', 'get_production_by_frota_carga', 'get_production_by_maquinas_carga'
+])
+def test_massa_total_sempre_float(dados: pd.DataFrame, monkeypatch: pytest.MonkeyPatch, endpoint: str,
+                                  max_celulas: int):
+    """Com a Massa guardada como inteiro (uint8 na carga), a massa total continua saindo como float"""
+    inteiros = dados.assign(Massa=CycleRepository._downcast_massa(dados['Massa']))
+    assert pd.api.types.is_integer_dtype(inteiros['Massa'])
+    monkeypatch.setattr(cycle_service, 'DENSE_GROUPBY_MAX_CELLS', max_celulas)
+    
+    result = getattr(CycleService(_RepositorioEmMemoria(inteiros)), endpoint)(DateRangeDTO())
+    
+    assert len(result) > 0
+    assert all(type(item['massa_total']) is float for item in result)